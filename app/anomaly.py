@@ -0,0 +1,87 @@
+import warnings
+import numpy as np
+
+ANOMALY_METHODS = ("zscore", "mad", "seasonal")
+ANOMALY_METRICS = ("count", "rate")
+ANOMALY_DIRECTIONS = ("upper", "both")
+
+# Scales a median absolute deviation to the standard deviation of normally distributed values.
+MAD_SCALE = 1.4826
+
+class AnomalyDetector:
+    # Scores the latest value of each control against a rolling baseline of its own previous runs,
+    # for all the controls of a controller at once:
+    # - zscore: mean and standard deviation of the last `window` runs
+    # - mad: median and median absolute deviation of the last `window` runs, robust to past spikes
+    # - seasonal: median and MAD of the runs one, two, ... `window` seasons back, where a season is
+    #   `season_length` runs (7 for a daily job with a weekly cycle)
+
+    def __init__(
+        self,
+        method: str = "mad",
+        window: int = 30,
+        threshold: float = 3.5,
+        min_history: int = 7,
+        season_length: int = 7,
+        metric: str = "count",
+        direction: str = "upper",
+    ):
+        if method not in ANOMALY_METHODS:
+            raise ValueError(f"Unknown anomaly detection method {method!r}, expected one of {', '.join(ANOMALY_METHODS)}.")
+        if metric not in ANOMALY_METRICS:
+            raise ValueError(f"Unknown anomaly detection metric {metric!r}, expected one of {', '.join(ANOMALY_METRICS)}.")
+        if direction not in ANOMALY_DIRECTIONS:
+            raise ValueError(f"Unknown anomaly detection direction {direction!r}, expected one of {', '.join(ANOMALY_DIRECTIONS)}.")
+        if window < 2 or min_history < 2 or season_length < 1:
+            raise ValueError("Anomaly detection needs a window and min_history of at least 2 and a positive season_length.")
+        self.method = method
+        self.window = window
+        self.threshold = threshold
+        self.min_history = min(min_history, window)
+        self.season_length = season_length
+        self.metric = metric
+        self.direction = direction
+
+    @property
+    def history_length(self) -> int:
+        # How many previous runs the baseline is drawn from.
+        return self.window * self.season_length if self.method == "seasonal" else self.window
+
+    def values(self, results: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        # The rate is the share of failing rows, so a growing table does not look like a growing problem.
+        results = np.asarray(results, dtype=np.float64)
+        if self.metric == "count":
+            return results
+        rows = np.asarray(rows, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(rows > 0, results / rows, np.nan)
+
+    def detect(self, history: np.ndarray, current: np.ndarray, current_rows: np.ndarray) -> tuple:
+        # history is (controls, history_length), oldest first and NaN-padded on the left; current holds
+        # the values of this run. Returns the baseline, the score and whether each control is anomalous,
+        # or NaN/False where there is not enough history yet.
+        if self.method == "seasonal":
+            # The runs at the same point of the cycle as this one: one, two, ... seasons ago.
+            points = history[:, history.shape[1] - self.season_length::-self.season_length]
+        else:
+            points = history
+        enough = np.count_nonzero(~np.isnan(points), axis=1) >= self.min_history
+        with warnings.catch_warnings():
+            # Controls without history are all-NaN rows; their results are masked below.
+            warnings.simplefilter("ignore", RuntimeWarning)
+            if self.method == "zscore":
+                baseline = np.nanmean(points, axis=1)
+                spread = np.nanstd(points, axis=1, ddof=1)
+            else:
+                baseline = np.nanmedian(points, axis=1)
+                spread = MAD_SCALE * np.nanmedian(np.abs(points - baseline[:, None]), axis=1)
+        # A flat history has no spread; a change of one row is then the smallest one that counts.
+        one_row = np.ones_like(current) if self.metric == "count" else 1 / np.where(current_rows > 0, current_rows, np.nan)
+        spread = np.fmax(spread, one_row)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            score = (current - baseline) / spread
+        enough &= ~np.isnan(score)
+        exceeded = score > self.threshold if self.direction == "upper" else np.abs(score) > self.threshold
+        baseline = np.where(enough, baseline, np.nan)
+        score = np.where(enough, score, np.nan)
+        return baseline, score, enough & exceeded
@@ -1,6 +1,9 @@
+import sys
+import json
 import logging
+import argparse
+from fnmatch import fnmatchcase
 import yaml
-import time
 from executor import Executor
 
 logging.basicConfig(
@@ -16,10 +19,16 @@ class App:
     # Open to improvements...
     CONTROLLER_CONFIG_PATH = "./app/controllers/config/config.yaml"
 
-    def __init__(self):
-        controller_configs = self.__load_config(self.CONTROLLER_CONFIG_PATH)
-        self.executor = Executor(controller_configs)  
-        
+    def __init__(self, config_path: str = CONTROLLER_CONFIG_PATH, only: list = None, exclude: list = None, publish: bool = True):
+        self.config_path = config_path
+        self.only = only or []
+        self.exclude = exclude or []
+        self.publish = publish
+        self.config = self.__load_config(config_path)
+        self.config["controllers"] = self.select_controllers(self.config["controllers"])
+        # Built on first use, so --dry-run never opens the state store, the result cache or a connection.
+        self.executor = None
+
     def __load_config(self,path):
         try:
             with open(path, "r") as file:
@@ -29,17 +38,79 @@ class App:
         except Exception as e:
             raise RuntimeError(f"Error loading controller config: {e}")
 
+    @staticmethod
+    def _controller_names(controller_config: dict) -> list:
+        # --only and --exclude patterns match the class name, the table or db_name.table.
+        return [
+            controller_config.get("class_name", ""),
+            controller_config.get("table_name", ""),
+            f"{controller_config.get('db_name', '')}.{controller_config.get('table_name', '')}",
+        ]
+
+    def select_controllers(self, controller_configs: list) -> list:
+        selected = []
+        for controller_config in controller_configs:
+            names = self._controller_names(controller_config)
+            if self.only and not any(fnmatchcase(name, pattern) for pattern in self.only for name in names):
+                continue
+            if any(fnmatchcase(name, pattern) for pattern in self.exclude for name in names):
+                continue
+            selected.append(controller_config)
+        if len(selected) < len(controller_configs):
+            logger.info(f"Selected {len(selected)} of {len(controller_configs)} controllers.")
+        return selected
+
+    def _get_executor(self) -> Executor:
+        if self.executor is None:
+            self.executor = Executor(self.config, publish=self.publish)
+        return self.executor
+
+    def plan(self) -> list:
+        # Builds the controllers, which validates their config and compiles their rules, without any I/O.
+        from controllers.controller_factory import ControllerFactory
+
+        return [Executor.describe_plan(ControllerFactory.create_controller(dict(controller_config))) for controller_config in self.config["controllers"]]
+
     def run(self):
+        executor = self._get_executor()
         try:
-            self.executor.execute_controllers()
-            self.executor.upsert_assertions()
-            # Wait for some time to let the assertions upserted
-            # Open to improvements...
-            time.sleep(5)
-            self.executor.report_assertion_results()
+            if self.publish:
+                # Each table's results are published as soon as that table is validated
+                executor.run_pipeline()
+            else:
+                executor.execute_controllers()
         except Exception as e:
             logger.error(f"Error running app: {e}")
+        finally:
+            executor.close()
+
+    def serve(self):
+        # Runs every controller on its schedule until interrupted; see the "service" section of config.yaml.
+        from service import QualityService
+
+        QualityService(self.config_path, self.config, self._get_executor(), select_controllers=self.select_controllers).serve_forever()
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the data quality checks and publish the results to DataHub.")
+    parser.add_argument("--config", default=App.CONTROLLER_CONFIG_PATH, help=f"Path of the controller config (default: {App.CONTROLLER_CONFIG_PATH}).")
+    parser.add_argument("--only", action="append", metavar="PATTERN", help="Only run controllers whose class name, table or db_name.table matches the glob pattern. Can be repeated.")
+    parser.add_argument("--exclude", action="append", metavar="PATTERN", help="Skip controllers whose class name, table or db_name.table matches the glob pattern. Can be repeated.")
+    parser.add_argument("--dry-run", action="store_true", help="Validate the config and print the execution plan as JSON without touching any database or DataHub.")
+    parser.add_argument("--no-publish", action="store_true", help="Run the checks without publishing anything to DataHub.")
+    parser.add_argument("--serve", action="store_true", help="Keep running and execute every controller on its schedule.")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    app = App()
-    app.run()
+    args = parse_args()
+    try:
+        app = App(args.config, only=args.only, exclude=args.exclude, publish=not args.no_publish)
+        if args.dry_run:
+            print(json.dumps(app.plan(), indent=2, default=str))
+            sys.exit(0)
+    except Exception as e:
+        logger.error(f"Invalid configuration: {e}")
+        sys.exit(1)
+    if args.serve:
+        app.serve()
+    else:
+        app.run()
@@ -6,15 +6,19 @@ from datahub.ingestion.graph.client import DatahubClientConfig, DataHubGraph
 logger = logging.getLogger("QUALITY_CHEKS")
 
 class AssertionHandler:
-    def __init__(self, server_url, platform_urn):
+    def __init__(self, server_url, platform_urn, graph: DataHubGraph = None):
         self._server_url = server_url
         self._platform_urn = platform_urn
-        self._graph = self._initialize_datahub_client()
+        # A shared client is owned, and closed, by whoever passed it in.
+        self._owns_graph = graph is None
+        self._graph = graph if graph is not None else self.initialize_datahub_client(self._server_url)
         logging.info(f"AssertionHandler initialized for {self._platform_urn}")
 
-    def _initialize_datahub_client(self) -> DataHubGraph:
+    @staticmethod
+    def initialize_datahub_client(server_url: str, retry_max_times: int = None) -> DataHubGraph:
         try:
-            client_config = DatahubClientConfig(server=self._server_url)
+            client_options = {} if retry_max_times is None else {"retry_max_times": retry_max_times}
+            client_config = DatahubClientConfig(server=server_url, **client_options)
             logging.info(f"Initializing DataHubGraph with config: {client_config}")
             return DataHubGraph(config=client_config)
         except Exception as e:
@@ -50,7 +54,16 @@ class AssertionHandler:
             logging.error(f"Error during assertion report: {e}")
             return False
         
+    def assertion_exists(self, urn: str) -> bool:
+        try:
+            return self._graph.exists(urn)
+        except Exception as e:
+            logging.error(f"Error during assertion lookup: {e}")
+            return False
+
     def close(self):
+        if not self._owns_graph:
+            return
         try:
             self._graph.close()
             logging.info("AssertionHandler client closed successfully.")
@@ -0,0 +1,96 @@
+import sys
+import logging
+
+logger = logging.getLogger("QUALITY_CHEKS")
+
+class AdaptiveChunkSizer:
+    # Steers the rows per chunk toward a memory budget and a target time per chunk, from the bytes and
+    # seconds per row of the chunks seen so far. The fetchers read `size` before every fetch. A chunk
+    # over budget shrinks the next one at once, while growth is at most doubling per chunk.
+
+    # Object columns only hold pointers in the frame, so their size is measured on this many rows.
+    SAMPLE_ROWS = 1024
+    # Changes smaller than this share of the current size are ignored, so the size does not jitter.
+    MIN_CHANGE = 0.1
+
+    def __init__(
+        self,
+        label: str,
+        initial_size: int,
+        memory_budget_mb: float = 256,
+        target_seconds: float = 1.0,
+        min_chunk_size: int = 1000,
+        max_chunk_size: int = 1_000_000,
+        chunks_in_flight: int = 1,
+        smoothing: float = 0.5,
+    ):
+        if min_chunk_size < 1 or max_chunk_size < min_chunk_size:
+            raise ValueError(f"Adaptive chunking of {label} needs 1 <= min_chunk_size <= max_chunk_size.")
+        self.label = label
+        self.memory_budget_bytes = memory_budget_mb * 1024 * 1024
+        self.target_seconds = target_seconds
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        # Chunks held at the same time, e.g. the ones queued by parallel keyset workers; they share the budget.
+        self.chunks_in_flight = max(1, chunks_in_flight)
+        self.smoothing = smoothing
+        self.size = self._clamp(initial_size)
+        self.bytes_per_row = None
+        self.buffer_bytes_per_row = 0.0
+        self.seconds_per_row = None
+        self.sizes = [self.size]
+
+    def _clamp(self, size: float) -> int:
+        return int(min(max(size, self.min_chunk_size), self.max_chunk_size))
+
+    @classmethod
+    def chunk_bytes(cls, chunk) -> int:
+        # Exact for numeric, categorical and Arrow columns; the strings behind object columns are extrapolated.
+        chunk_bytes = int(chunk.memory_usage(index=False, deep=False).sum())
+        object_columns = [column for column in chunk.columns if chunk[column].dtype == object]
+        if object_columns and len(chunk):
+            sample = chunk[object_columns].iloc[: cls.SAMPLE_ROWS]
+            object_bytes = sample.memory_usage(index=False, deep=True).sum() - sample.memory_usage(index=False, deep=False).sum()
+            chunk_bytes += int(object_bytes * len(chunk) / len(sample))
+        return chunk_bytes
+
+    def observe_row_buffer(self, rows: list):
+        # Fetchers that build chunks from driver tuples hold both while the frame is built, so the tuples
+        # count against the budget too; they are measured on a sample of rows.
+        sample = rows[: self.SAMPLE_ROWS]
+        if sample:
+            row_bytes = sum(sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row) for row in sample) / len(sample)
+            self.buffer_bytes_per_row = self._smooth(self.buffer_bytes_per_row or None, row_bytes)
+
+    def _smooth(self, previous, value: float) -> float:
+        return value if previous is None else self.smoothing * value + (1 - self.smoothing) * previous
+
+    def observe(self, rows: int, chunk_bytes: int, seconds: float):
+        # seconds covers fetching and evaluating the chunk. Much shorter chunks are the tail of the result or
+        # of a key range, whose fixed per-chunk overhead would read as a high cost per row.
+        if rows <= 0 or rows < self.size / 4:
+            return
+        self.bytes_per_row = self._smooth(self.bytes_per_row, chunk_bytes / rows)
+        self.seconds_per_row = self._smooth(self.seconds_per_row, seconds / rows)
+        peak_bytes_per_row = self.bytes_per_row + self.buffer_bytes_per_row
+        memory_rows = self.memory_budget_bytes / self.chunks_in_flight / peak_bytes_per_row if peak_bytes_per_row else self.max_chunk_size
+        latency_rows = self.target_seconds / self.seconds_per_row if self.seconds_per_row else self.max_chunk_size
+        size = self._clamp(min(memory_rows, latency_rows, self.size * 2))
+        if abs(size - self.size) < self.MIN_CHANGE * self.size:
+            return
+        bound = "memory budget" if memory_rows <= latency_rows else "target latency"
+        logger.info(
+            f"Chunk size of {self.label} set to {size} rows (was {self.size}), bound by the {bound}: "
+            f"{peak_bytes_per_row:.0f} bytes and {self.seconds_per_row * 1e6:.2f} µs per row."
+        )
+        self.size = size
+        self.sizes.append(size)
+
+    def metrics(self) -> dict:
+        return {
+            "chunk_size_initial": self.sizes[0],
+            "chunk_size_final": self.size,
+            "chunk_size_min": min(self.sizes),
+            "chunk_size_max": max(self.sizes),
+            "chunk_size_changes": len(self.sizes) - 1,
+        }
@@ -1,6 +1,13 @@
-import pandas as pd
+from __future__ import annotations
 import logging
+import hashlib
+import json
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+from .rules import CompiledRule, SKETCH_KINDS, compile_rule, in_set_predicate, sql_literal
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger("QUALITY_CHEKS")
 
@@ -21,6 +28,24 @@ class BaseController(ABC):
         datahub_platform_urn: str,
         datahub_entity_urn: str,
         column_operations: list,
+        execution_mode: str = "pandas",
+        watermark_column: str = None,
+        full_refresh: bool = False,
+        scan_key: str = None,
+        scan_workers: int = 1,
+        fetch_backend: str = "pandas",
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        profiler: str = None,
+        sampling_method: str = None,
+        sample_fraction: float = 0.01,
+        sample_size: int = 100000,
+        confidence_level: float = 0.95,
+        tolerance: float = 0.0,
+        fingerprint: str = None,
+        schedule: str = None,
+        anomaly_detection: dict = None,
+        adaptive_chunking: dict = None,
     ):
         self.db_type = db_type
         self.db_user = db_user
@@ -35,7 +60,30 @@ class BaseController(ABC):
         self.datahub_platform_urn = datahub_platform_urn
         self.datahub_entity_urn = datahub_entity_urn
         self._column_operations = column_operations
+        self.execution_mode = execution_mode
+        self.watermark_column = watermark_column
+        self.full_refresh = full_refresh
+        self.scan_key = scan_key
+        self.scan_workers = scan_workers
+        self.fetch_backend = fetch_backend
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.profiler = profiler
+        self.sampling_method = sampling_method
+        self.sample_fraction = sample_fraction
+        self.sample_size = sample_size
+        self.confidence_level = confidence_level
+        self.tolerance = tolerance
+        self.fingerprint = fingerprint
+        self.schedule = schedule
+        self.anomaly_detection = anomaly_detection
+        self.adaptive_chunking = adaptive_chunking
         self.executor_feed = self._init_executor_feed()
+        self._compiled_rules = self._compile_rules()
+        self.execution_metrics = {}
+        self.column_dtypes = {
+            column["name"]: column["dtype"] for column in self._column_operations if column.get("dtype")
+        }
 
     def _init_executor_feed(self):
         logger.info("Initializing executor feed.")
@@ -49,12 +97,103 @@ class BaseController(ABC):
                             "column": column.get("name"),
                             "control_name": control.get("name"),
                             "method": control.get("responsible_method"),
+                            "predicate": control.get("predicate"),
+                            "rule": control.get("rule"),
                             "result": result,
+                            "rows": 0,
                             "status": "Not Run",
                         }
                     )
         return output
 
+    def reset(self):
+        # Clears the results of the previous run, so a long-lived controller can run again.
+        self.executor_feed = self._init_executor_feed()
+        self.execution_metrics = {}
+
+    def _compile_rules(self) -> dict:
+        # Declarative rules are compiled once here, so a bad rule fails at startup instead of mid-scan.
+        known_columns = [column.get("name") for column in self._column_operations]
+        return {
+            control["control_name"]: compile_rule(control["rule"], control["column"], self.db_type, known_columns)
+            for control in self.executor_feed
+            if control["rule"]
+        }
+
+    def get_compiled_rule(self, control: dict) -> CompiledRule:
+        return self._compiled_rules.get(control["control_name"])
+
+    def get_kernel(self, control: dict):
+        # (kind, argument) of the control's ControlPlan kernel, or None when it only has a method.
+        compiled_rule = self.get_compiled_rule(control)
+        if compiled_rule:
+            return compiled_rule.kernel
+        kernel_method = getattr(self, f"{control['method']}_kernel", None)
+        return kernel_method() if kernel_method else None
+
+    def is_additive(self) -> bool:
+        # Sketch counts cover the whole stream, so they cannot be merged with a previous run.
+        for control in self.executor_feed:
+            kernel = self.get_kernel(control)
+            if kernel and kernel[0] in SKETCH_KINDS:
+                return False
+        return True
+
+    def required_columns(self, controls: list = None) -> list:
+        # Columns the given controls read, all of the executor feed by default; pushed-down controls are left out by the caller.
+        columns = []
+        for control in self.executor_feed if controls is None else controls:
+            compiled_rule = self.get_compiled_rule(control)
+            for column in compiled_rule.columns if compiled_rule else [control["column"]]:
+                if column not in columns:
+                    columns.append(column)
+        return columns
+
+    @staticmethod
+    def _control_definition(control: dict) -> list:
+        return [control["column"], control["control_name"], control["method"], control["predicate"]] + ([control["rule"]] if control["rule"] else [])
+
+    @staticmethod
+    def _definition_hash(definition) -> str:
+        return hashlib.sha256(json.dumps(definition, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    def control_definition_hash(self) -> str:
+        return self._definition_hash([self._control_definition(control) for control in self.executor_feed])
+
+    def state_key(self) -> str:
+        # Changing any control invalidates the saved state, so stale partial counts are never merged.
+        return f"{self.db_host}:{self.db_port}/{self.db_name}.{self.table_name}#{self.control_definition_hash()}"
+
+    def history_series_key(self, control: dict) -> str:
+        # One series per control definition: editing a rule starts a new history instead of comparing different checks.
+        definition_hash = self._definition_hash(self._control_definition(control))
+        return f"{self.db_host}:{self.db_port}/{self.db_name}.{self.table_name}/{control['control_name']}#{definition_hash}"
+
+    def result_cache_key(self) -> str:
+        # Sampled results are estimates, so they are only reused by runs that sample the same way.
+        sampling = f"@{self.sampling_method}:{self.sample_fraction}:{self.sample_size}" if self.sampling_method else ""
+        return f"{self.state_key()}{sampling}"
+
+    @staticmethod
+    def _get_status(result: int) -> str:
+        return "SUCCESS" if result == 0 else "FAILURE"
+
+    def _get_estimated_status(self, ci_low_rate: float) -> str:
+        # A sampled control only fails when even the optimistic end of the interval is above the tolerance.
+        return "SUCCESS" if ci_low_rate <= self.tolerance else "FAILURE"
+
+    def get_sql_predicate(self, control: dict):
+        # A predicate set in the config wins over the one declared by the controller.
+        if control.get("predicate"):
+            return control["predicate"]
+        compiled_rule = self.get_compiled_rule(control)
+        if compiled_rule:
+            return compiled_rule.predicate
+        predicate_method = getattr(self, f"{control['method']}_predicate", None)
+        if predicate_method is None:
+            return None
+        return predicate_method(control["column"])
+
     @staticmethod
     def _validate_columns(df: pd.DataFrame, column_names: list):
         missing_columns = [col for col in column_names if col not in df.columns]
@@ -83,4 +222,53 @@ class BaseController(ABC):
     @staticmethod
     def _count_overvalued(df: pd.DataFrame, column_name: str, threshold: int) -> int:
         BaseController._validate_columns(df, [column_name])
-        return int((df[column_name] > threshold).sum())
\ No newline at end of file
+        return int((df[column_name] > threshold).sum())
+
+    # SQL push-down predicates, matching the pandas helpers above row for row.
+    def _sql_literal(self, value) -> str:
+        return sql_literal(value, self.db_type)
+
+    @staticmethod
+    def _negative_predicate(column_name: str) -> str:
+        return f"{column_name} < 0"
+
+    @staticmethod
+    def _null_predicate(column_name: str) -> str:
+        return f"{column_name} IS NULL"
+
+    def _off_list_predicate(self, column_name: str, preset_list: list) -> str:
+        return in_set_predicate(column_name, preset_list, self.db_type)
+
+    @staticmethod
+    def _overvalued_predicate(column_name: str, threshold: int) -> str:
+        return f"{column_name} > {threshold}"
+
+    # Vectorized kernels for the fused ControlPlan, as (kind, argument) pairs.
+    @staticmethod
+    def _negative_kernel() -> tuple:
+        return ("lt", 0)
+
+    @staticmethod
+    def _null_kernel() -> tuple:
+        return ("null", None)
+
+    @staticmethod
+    def _off_list_kernel(preset_list: list) -> tuple:
+        return ("off_list", frozenset(item.lower() for item in preset_list))
+
+    @staticmethod
+    def _overvalued_kernel(threshold: int) -> tuple:
+        return ("gt", threshold)
+
+    # Cross-chunk kernels backed by the bounded-memory sketches.
+    @staticmethod
+    def _duplicate_kernel(memory_limit: int = 5_000_000, spill_dir: str = None) -> tuple:
+        return ("duplicate", {"memory_limit": memory_limit, "spill_dir": spill_dir})
+
+    @staticmethod
+    def _distinct_kernel(precision: int = 14, min_value: int = None, max_value: int = None) -> tuple:
+        return ("distinct", {"precision": precision, "min_value": min_value, "max_value": max_value})
+
+    @staticmethod
+    def _heavy_hitters_kernel(max_share: float = 0.01, top_k: int = 10) -> tuple:
+        return ("heavy_hitters", {"max_share": max_share, "top_k": top_k})
@@ -0,0 +1,169 @@
+import time
+import logging
+import numpy as np
+import pandas as pd
+from .sketches import SKETCHES, create_sketch
+
+logger = logging.getLogger("QUALITY_CHEKS")
+
+class ControlPlan:
+
+    COMPARISONS = {
+        "lt": np.less,
+        "le": np.less_equal,
+        "gt": np.greater,
+        "ge": np.greater_equal,
+    }
+
+    def __init__(self, controller, controls: list):
+        self._controller = controller
+        self._controls = controls
+        self._fused_controls = {}
+        self._fallback_controls = []
+        self._expression_controls = []
+        # Stateful kernels, kept across chunks and settled in finish().
+        self._sketches = {}
+        self._validated = False
+        self.control_cpu_seconds = {control["control_name"]: 0.0 for control in controls}
+        self._compile(controls)
+
+    def _compile(self, controls: list):
+        for control in controls:
+            kernel = self._controller.get_kernel(control)
+            if kernel is None:
+                self._fallback_controls.append(control)
+                continue
+            kind, argument = kernel
+            if kind == "expression":
+                self._expression_controls.append((control, argument))
+            else:
+                if kind in SKETCHES:
+                    self._sketches[control["control_name"]] = (control, create_sketch(kind, argument))
+                self._fused_controls.setdefault(control["column"], []).append((control, kind, argument))
+        logger.info(
+            f"Compiled plan for {self._controller.table_name}: "
+            f"{sum(len(kernels) for kernels in self._fused_controls.values())} fused, "
+            f"{len(self._fallback_controls)} fallback controls."
+        )
+
+    def _validate(self, df: pd.DataFrame):
+        expression_columns = [column for _, (_, columns) in self._expression_controls for column in columns]
+        self._controller._validate_columns(df, list(self._fused_controls) + expression_columns)
+        self._validated = True
+
+    def evaluate(self, df: pd.DataFrame):
+        if not self._validated:
+            self._validate(df)
+        # Every control keeps the number of rows it was evaluated on, which sampled runs scale up from.
+        for control in self._controls:
+            control["rows"] = control.get("rows", 0) + len(df)
+        for column, kernels in self._fused_controls.items():
+            counts = self._evaluate_column(df[column], kernels)
+            for (control, _, _), count in zip(kernels, counts):
+                control["result"] += count
+                control["status"] = self._controller._get_status(control["result"])
+        for control, (expression, columns) in self._expression_controls:
+            start_time = time.thread_time()
+            count = self._count_expression_failures(df, expression, columns)
+            self.control_cpu_seconds[control["control_name"]] += time.thread_time() - start_time
+            control["result"] += count
+            control["status"] = self._controller._get_status(control["result"])
+        for control in self._fallback_controls:
+            start_time = time.thread_time()
+            result, status = getattr(self._controller, control["method"])(df, control["column"])
+            self.control_cpu_seconds[control["control_name"]] += time.thread_time() - start_time
+            control["result"] += result
+            control["status"] = status
+
+    def finish(self):
+        # Settles the stateful kernels once every chunk has been evaluated.
+        for control, sketch in self._sketches.values():
+            start_time = time.thread_time()
+            count, details, status = sketch.finish()
+            self.control_cpu_seconds[control["control_name"]] += time.thread_time() - start_time
+            control["result"] += count
+            if details:
+                control["details"] = details
+            control["status"] = status or self._controller._get_status(control["result"])
+
+    def close(self):
+        for _, sketch in self._sketches.values():
+            sketch.close()
+
+    def _evaluate_column(self, series: pd.Series, kernels: list) -> list:
+        # Every conversion is done at most once per column and shared by all of its kernels.
+        null_mask = None
+        values = None
+        counts = []
+        for control, kind, argument in kernels:
+            # Shared conversions are charged to the first control that needs them.
+            start_time = time.thread_time()
+            if kind == "null":
+                if null_mask is None:
+                    null_mask = series.isna().to_numpy()
+                counts.append(int(np.count_nonzero(null_mask)))
+            elif kind in self.COMPARISONS:
+                if values is None:
+                    values = self._numeric_values(series)
+                with np.errstate(invalid="ignore"):
+                    counts.append(int(np.count_nonzero(self.COMPARISONS[kind](values, argument))))
+            elif kind == "outside":
+                if values is None:
+                    values = self._numeric_values(series)
+                counts.append(self._count_outside(values, *argument))
+            elif kind == "off_list":
+                counts.append(self._count_off_list(series, argument))
+            elif kind == "off_set":
+                counts.append(self._count_distinct_matches(series, lambda value: value not in argument))
+            elif kind == "regex_mismatch":
+                counts.append(self._count_distinct_matches(series, lambda value: not isinstance(value, str) or argument.fullmatch(value) is None))
+            elif kind in SKETCHES:
+                counts.append(self._sketches[control["control_name"]][1].update(series))
+            else:
+                raise ValueError(f"Unknown kernel kind: {kind}")
+            self.control_cpu_seconds[control["control_name"]] += time.thread_time() - start_time
+        return counts
+
+    @staticmethod
+    def _numeric_values(series: pd.Series) -> np.ndarray:
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind in "iuf":
+            return series.to_numpy()
+        return series.to_numpy(dtype="float64", na_value=np.nan)
+
+    @staticmethod
+    def _count_outside(values: np.ndarray, low, high, low_inclusive: bool, high_inclusive: bool) -> int:
+        outside = np.zeros(len(values), dtype=bool)
+        with np.errstate(invalid="ignore"):
+            if low is not None:
+                outside |= (values < low) if low_inclusive else (values <= low)
+            if high is not None:
+                outside |= (values > high) if high_inclusive else (values >= high)
+        return int(np.count_nonzero(outside))
+
+    @classmethod
+    def _count_off_list(cls, series: pd.Series, allowed_values: frozenset) -> int:
+        return cls._count_distinct_matches(series, lambda value: not isinstance(value, str) or value.lower() not in allowed_values)
+
+    @staticmethod
+    def _count_distinct_matches(series: pd.Series, matches) -> int:
+        # Only the distinct values are tested; rows are counted through their codes.
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            uniques = series.cat.categories
+        else:
+            codes, uniques = pd.factorize(series)
+        matched = np.fromiter((matches(value) for value in uniques), dtype=bool, count=len(uniques))
+        counts_per_value = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        return int(counts_per_value[matched].sum())
+
+    @staticmethod
+    def _count_expression_failures(df: pd.DataFrame, expression: str, columns: tuple) -> int:
+        # Rows where the expression is false fail; rows with a null operand are skipped, as in SQL.
+        passed = df.eval(expression)
+        if isinstance(passed, pd.Series):
+            passed = passed.astype("boolean").fillna(True).to_numpy(dtype=bool)
+        else:
+            passed = np.full(len(df), bool(passed))
+        if columns:
+            passed |= df[list(columns)].isna().any(axis=1).to_numpy()
+        return int(np.count_nonzero(~passed))
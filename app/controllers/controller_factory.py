@@ -2,6 +2,7 @@ from typing import Dict, Type
 import logging
 from .base_controller import BaseController
 from .product_controller import ProductController
+from .rule_controller import RuleController
 
 logger = logging.getLogger(__name__)
 
@@ -9,6 +10,7 @@ class ControllerFactory:
 
     __controllers: Dict[str, Type] = {
         "ProductController": ProductController,
+        "RuleController": RuleController,
     }
 
     @classmethod
@@ -1,6 +1,10 @@
-import pandas as pd
+from __future__ import annotations
+from typing import TYPE_CHECKING
 from .base_controller import BaseController
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 class ProductController(BaseController):
 
     # Open to improvements...
@@ -22,6 +26,24 @@ class ProductController(BaseController):
         datahub_platform_urn: str,
         datahub_entity_urn: str,
         column_operations: list,
+        execution_mode: str = "pandas",
+        watermark_column: str = None,
+        full_refresh: bool = False,
+        scan_key: str = None,
+        scan_workers: int = 1,
+        fetch_backend: str = "pandas",
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        profiler: str = None,
+        sampling_method: str = None,
+        sample_fraction: float = 0.01,
+        sample_size: int = 100000,
+        confidence_level: float = 0.95,
+        tolerance: float = 0.0,
+        fingerprint: str = None,
+        schedule: str = None,
+        anomaly_detection: dict = None,
+        adaptive_chunking: dict = None,
     ):
         super().__init__(
             db_type,
@@ -37,6 +59,24 @@ class ProductController(BaseController):
             datahub_platform_urn,
             datahub_entity_urn,
             column_operations,
+            execution_mode,
+            watermark_column,
+            full_refresh,
+            scan_key,
+            scan_workers,
+            fetch_backend,
+            pool_size,
+            max_overflow,
+            profiler,
+            sampling_method,
+            sample_fraction,
+            sample_size,
+            confidence_level,
+            tolerance,
+            fingerprint,
+            schedule,
+            anomaly_detection,
+            adaptive_chunking,
         )
 
     # Product Price Validations
@@ -83,4 +123,48 @@ class ProductController(BaseController):
         self._validate_columns(df, [column])
         result = self._count_off_list(df, column, self.VALID_CATEGORIES)
         status = "SUCCESS" if result == 0 else "FAILURE"
-        return result, status
\ No newline at end of file
+        return result, status
+
+    # SQL push-down predicates, looked up as "<responsible_method>_predicate".
+    def count_null_prices_predicate(self, column: str) -> str:
+        return self._null_predicate(column)
+
+    def count_invalid_prices_predicate(self, column: str) -> str:
+        return f"{column} <= 0"
+
+    def count_null_stocks_predicate(self, column: str) -> str:
+        return self._null_predicate(column)
+
+    def count_negative_stocks_predicate(self, column: str) -> str:
+        return self._negative_predicate(column)
+
+    def count_overvalued_stocks_predicate(self, column: str) -> str:
+        return self._overvalued_predicate(column, self.STOCK_THRESHOLD)
+
+    def count_null_categories_predicate(self, column: str) -> str:
+        return self._null_predicate(column)
+
+    def count_uncategorized_categories_predicate(self, column: str) -> str:
+        return self._off_list_predicate(column, self.VALID_CATEGORIES)
+
+    # Fused plan kernels, looked up as "<responsible_method>_kernel".
+    def count_null_prices_kernel(self) -> tuple:
+        return self._null_kernel()
+
+    def count_invalid_prices_kernel(self) -> tuple:
+        return ("le", 0)
+
+    def count_null_stocks_kernel(self) -> tuple:
+        return self._null_kernel()
+
+    def count_negative_stocks_kernel(self) -> tuple:
+        return self._negative_kernel()
+
+    def count_overvalued_stocks_kernel(self) -> tuple:
+        return self._overvalued_kernel(self.STOCK_THRESHOLD)
+
+    def count_null_categories_kernel(self) -> tuple:
+        return self._null_kernel()
+
+    def count_uncategorized_categories_kernel(self) -> tuple:
+        return self._off_list_kernel(self.VALID_CATEGORIES)
@@ -0,0 +1,7 @@
+from .base_controller import BaseController
+
+class RuleController(BaseController):
+
+    # Runs only the declarative rules set in config.yaml; tables that need custom logic
+    # get their own controller with methods, like ProductController.
+    pass
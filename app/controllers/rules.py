@@ -0,0 +1,141 @@
+import re
+import ast
+
+RULE_TYPES = ("not_null", "range", "in_set", "regex", "unique", "distinct_count", "heavy_hitters", "expression")
+
+# Kernels backed by a sketch; kept here so planning does not have to import numpy through sketches.py.
+SKETCH_KINDS = ("duplicate", "distinct", "heavy_hitters")
+
+class CompiledRule:
+    # A rule from config.yaml, compiled once into a ControlPlan kernel and, when the database can
+    # evaluate it row by row, a SQL predicate matching the failing rows.
+
+    def __init__(self, kind: str, argument, predicate: str = None, columns: list = None):
+        self.kind = kind
+        self.argument = argument
+        self.predicate = predicate
+        self.columns = columns or []
+
+    @property
+    def kernel(self) -> tuple:
+        return (self.kind, self.argument)
+
+# SQL helpers shared with the predicates declared by the controllers.
+def sql_literal(value, db_type: str = None) -> str:
+    if isinstance(value, str):
+        escaped = value.replace("'", "''")
+        if db_type == "mysql":
+            # MySQL reads backslashes in string literals as escapes, so a regex like \d would reach it as d.
+            escaped = escaped.replace("\\", "\\\\")
+        return f"'{escaped}'"
+    return str(value)
+
+def in_set_predicate(column: str, values: list, db_type: str, ignore_case: bool = True) -> str:
+    target = column
+    if ignore_case:
+        values = [value.lower() for value in values]
+        target = f"LOWER({column})"
+    if db_type == "mysql" and all(isinstance(value, str) for value in values):
+        # Compare bytes so MySQL's case and accent insensitive collations agree with pandas.
+        target = f"CAST({target} AS BINARY)"
+    return f"{column} IS NOT NULL AND {target} NOT IN ({', '.join(sql_literal(value, db_type) for value in values)})"
+
+def _compile_not_null(rule: dict, column: str, db_type: str, known_columns: list) -> CompiledRule:
+    return CompiledRule("null", None, f"{column} IS NULL", [column])
+
+def _compile_range(rule: dict, column: str, db_type: str, known_columns: list) -> CompiledRule:
+    low, high = rule.get("min"), rule.get("max")
+    if low is None and high is None:
+        raise ValueError(f"Range rule on {column} needs a min or a max.")
+    low_inclusive = rule.get("min_inclusive", True)
+    high_inclusive = rule.get("max_inclusive", True)
+    conditions = []
+    if low is not None:
+        conditions.append(f"{column} {'<' if low_inclusive else '<='} {float(low)}")
+    if high is not None:
+        conditions.append(f"{column} {'>' if high_inclusive else '>='} {float(high)}")
+    return CompiledRule("outside", (low, high, low_inclusive, high_inclusive), f"({' OR '.join(conditions)})", [column])
+
+def _compile_in_set(rule: dict, column: str, db_type: str, known_columns: list) -> CompiledRule:
+    values = rule.get("values")
+    if not values:
+        raise ValueError(f"in_set rule on {column} needs a list of values.")
+    # Case is only ignored when every allowed value is a string.
+    ignore_case = rule.get("ignore_case", True) and all(isinstance(value, str) for value in values)
+    predicate = in_set_predicate(column, values, db_type, ignore_case)
+    if ignore_case:
+        values = [value.lower() for value in values]
+    return CompiledRule("off_list" if ignore_case else "off_set", frozenset(values), predicate, [column])
+
+def _compile_regex(rule: dict, column: str, db_type: str, known_columns: list) -> CompiledRule:
+    pattern = rule.get("pattern")
+    if not pattern:
+        raise ValueError(f"regex rule on {column} needs a pattern.")
+    compiled = re.compile(pattern)
+    predicate = None
+    # Anchored so the database, like the plan, only accepts full matches.
+    if db_type == "mysql":
+        predicate = f"{column} IS NOT NULL AND NOT REGEXP_LIKE({column}, {sql_literal(f'^(?:{pattern})$', db_type)}, 'c')"
+    elif db_type == "postgresql":
+        predicate = f"{column} IS NOT NULL AND {column} !~ {sql_literal(f'^(?:{pattern})$', db_type)}"
+    elif db_type == "duckdb":
+        predicate = f"{column} IS NOT NULL AND NOT regexp_full_match({column}, {sql_literal(pattern, db_type)})"
+    return CompiledRule("regex_mismatch", compiled, predicate, [column])
+
+# The rules below keep state across chunks in bounded-memory sketches; no row predicate can express them.
+def _compile_unique(rule: dict, column: str, db_type: str, known_columns: list) -> CompiledRule:
+    options = {"memory_limit": int(rule.get("memory_limit", 5_000_000)), "spill_dir": rule.get("spill_dir")}
+    return CompiledRule("duplicate", options, None, [column])
+
+def _compile_distinct_count(rule: dict, column: str, db_type: str, known_columns: list) -> CompiledRule:
+    options = {"precision": int(rule.get("precision", 14)), "min_value": rule.get("min"), "max_value": rule.get("max")}
+    if not 4 <= options["precision"] <= 18:
+        raise ValueError(f"distinct_count rule on {column} needs a precision between 4 and 18.")
+    return CompiledRule("distinct", options, None, [column])
+
+def _compile_heavy_hitters(rule: dict, column: str, db_type: str, known_columns: list) -> CompiledRule:
+    options = {
+        "max_share": float(rule.get("max_share", 0.01)),
+        "top_k": int(rule.get("top_k", 10)),
+        "width": int(rule.get("width", 16384)),
+        "depth": int(rule.get("depth", 4)),
+    }
+    return CompiledRule("heavy_hitters", options, None, [column])
+
+def _expression_names(expression: str, column: str) -> list:
+    # The names df.eval looks up as columns; names that are called are pandas' math functions (abs, log, ...).
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"expression rule on {column} is not a valid expression: {e.msg}.")
+    functions = {id(node.func) for node in ast.walk(tree) if isinstance(node, ast.Call)}
+    return list(dict.fromkeys(node.id for node in ast.walk(tree) if isinstance(node, ast.Name) and id(node) not in functions))
+
+def _compile_expression(rule: dict, column: str, db_type: str, known_columns: list) -> CompiledRule:
+    expression = rule.get("expr")
+    if not expression:
+        raise ValueError(f"expression rule on {column} needs an expr.")
+    referenced = _expression_names(expression, column)
+    unknown = [name for name in referenced if name not in known_columns]
+    if unknown:
+        raise ValueError(f"expression rule on {column} refers to columns not listed under column_operations: {', '.join(unknown)}.")
+    columns = [column] + [name for name in referenced if name != column]
+    predicate = f"NOT ({rule['sql']})" if rule.get("sql") else None
+    return CompiledRule("expression", (expression, tuple(referenced)), predicate, columns)
+
+RULE_COMPILERS = {
+    "not_null": _compile_not_null,
+    "range": _compile_range,
+    "in_set": _compile_in_set,
+    "regex": _compile_regex,
+    "unique": _compile_unique,
+    "distinct_count": _compile_distinct_count,
+    "heavy_hitters": _compile_heavy_hitters,
+    "expression": _compile_expression,
+}
+
+def compile_rule(rule: dict, column: str, db_type: str, known_columns: list) -> CompiledRule:
+    rule_type = rule.get("type") if isinstance(rule, dict) else None
+    if rule_type not in RULE_COMPILERS:
+        raise ValueError(f"Unknown rule type {rule_type!r} on {column}, expected one of {', '.join(RULE_TYPES)}.")
+    return RULE_COMPILERS[rule_type](rule, column, db_type, known_columns)
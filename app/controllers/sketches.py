@@ -0,0 +1,264 @@
+import os
+import math
+import shutil
+import logging
+import tempfile
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("QUALITY_CHEKS")
+
+UINT64_BITS = np.uint64(64)
+
+def _hash_array(values: np.ndarray) -> np.ndarray:
+    # Whole numbers hash the same whatever width or float type the fetch backend read them as. Floats are
+    # normalised value by value, never per chunk, so 1.0 hashes alike next to 2.0 or next to 2.5.
+    if values.dtype.kind == "i":
+        return pd.util.hash_array(values.astype(np.int64))
+    if values.dtype.kind == "f":
+        values = values.astype(np.float64)
+        with np.errstate(invalid="ignore"):
+            whole = (np.mod(values, 1) == 0) & (np.abs(values) < 2**63)
+        hashes = pd.util.hash_array(values)
+        if whole.any():
+            hashes[whole] = pd.util.hash_array(values[whole].astype(np.int64))
+        return hashes
+    if values.dtype.kind not in "ub":
+        values = values.astype(object)
+    return pd.util.hash_array(values)
+
+def hash_values(series: pd.Series) -> np.ndarray:
+    # 64-bit hashes of the non-null values; categorical columns only hash their categories.
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        category_hashes = _hash_array(series.cat.categories.to_numpy())
+        return category_hashes[codes[codes >= 0]]
+    return _hash_array(series.dropna().to_numpy())
+
+class DuplicateDetector:
+    # Exact duplicate count over a stream of hashes. Up to memory_limit distinct hashes are kept in a
+    # sorted array and duplicates are counted chunk by chunk; past that the hashes are spilled into
+    # hash-partitioned files and counted partition by partition at the end, so memory stays bounded.
+
+    PARTITION_BITS = 6
+    # Smallest block read back from a spilled partition, so tiny limits do not turn into tiny reads.
+    MIN_BLOCK_SIZE = 65536
+
+    def __init__(self, memory_limit: int = 5_000_000, spill_dir: str = None):
+        self.memory_limit = memory_limit
+        self._spill_dir = spill_dir
+        self._seen = np.empty(0, dtype=np.uint64)
+        self._total = 0
+        self._reported = 0
+        self._spill_path = None
+
+    def add(self, hashes: np.ndarray) -> int:
+        self._total += len(hashes)
+        if self._spill_path is not None:
+            # Only the distinct values of each chunk are spilled; the total keeps every row.
+            self._write_partitions(self._spill_path, np.unique(hashes), 0)
+            return 0
+        chunk_unique = np.unique(hashes)
+        positions = np.searchsorted(self._seen, chunk_unique)
+        known = positions < len(self._seen)
+        known[known] = self._seen[positions[known]] == chunk_unique[known]
+        new_hashes = chunk_unique[~known]
+        duplicates = len(hashes) - len(new_hashes)
+        if len(self._seen) + len(new_hashes) <= self.memory_limit:
+            self._seen = np.insert(self._seen, positions[~known], new_hashes)
+            self._reported += duplicates
+            return duplicates
+        # Over the limit: everything seen so far goes to disk and the count is settled in finish().
+        self._spill_path = tempfile.mkdtemp(prefix="quality_checks_unique_", dir=self._spill_dir)
+        logger.info(f"Duplicate detector spilling {len(self._seen) + len(new_hashes)} distinct values to {self._spill_path}.")
+        self._write_partitions(self._spill_path, np.concatenate([self._seen, new_hashes]), 0)
+        self._seen = np.empty(0, dtype=np.uint64)
+        self._reported += duplicates
+        return duplicates
+
+    def finish(self) -> int:
+        # Returns the duplicates not reported by add(); the spilled files hold every distinct value.
+        if self._spill_path is None:
+            return 0
+        try:
+            distinct = self._count_distinct(self._spill_path, 0)
+        finally:
+            self.close()
+        return self._total - distinct - self._reported
+
+    def close(self):
+        if self._spill_path is not None:
+            shutil.rmtree(self._spill_path, ignore_errors=True)
+            self._spill_path = None
+
+    @classmethod
+    def _partition_of(cls, hashes: np.ndarray, level: int) -> np.ndarray:
+        shift = np.uint64(64 - cls.PARTITION_BITS * (level + 1))
+        return ((hashes >> shift) & np.uint64((1 << cls.PARTITION_BITS) - 1)).astype(np.int64)
+
+    @classmethod
+    def _write_partitions(cls, directory: str, hashes: np.ndarray, level: int):
+        partitions = cls._partition_of(hashes, level)
+        order = np.argsort(partitions, kind="stable")
+        counts = np.bincount(partitions, minlength=1 << cls.PARTITION_BITS)
+        offset = 0
+        for partition, count in enumerate(counts):
+            if count:
+                with open(os.path.join(directory, f"{partition}.bin"), "ab") as file:
+                    file.write(hashes[order[offset:offset + count]].tobytes())
+                offset += count
+
+    def _count_distinct(self, directory: str, level: int) -> int:
+        distinct = 0
+        for file_name in os.listdir(directory):
+            path = os.path.join(directory, file_name)
+            size = os.path.getsize(path) // 8
+            block_size = max(self.memory_limit, self.MIN_BLOCK_SIZE)
+            if size <= block_size or level + 1 >= 64 // self.PARTITION_BITS:
+                distinct += len(np.unique(np.fromfile(path, dtype=np.uint64)))
+                continue
+            # A partition that still does not fit is split again on the next bits of the hash.
+            sub_directory = tempfile.mkdtemp(dir=directory)
+            for offset in range(0, size, block_size):
+                block = np.fromfile(path, dtype=np.uint64, count=block_size, offset=offset * 8)
+                self._write_partitions(sub_directory, np.unique(block), level + 1)
+            os.remove(path)
+            distinct += self._count_distinct(sub_directory, level + 1)
+        return distinct
+
+class HyperLogLog:
+    # Distinct count estimate in 2^precision one-byte registers, with a relative error of about 1.04 / sqrt(2^precision).
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self._registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, hashes: np.ndarray):
+        if len(hashes) == 0:
+            return
+        precision = np.uint64(self.precision)
+        index = (hashes >> (UINT64_BITS - precision)).astype(np.int64)
+        remaining = hashes << precision
+        rank = np.full(len(hashes), 64 - self.precision + 1, dtype=np.uint8)
+        non_zero = remaining != 0
+        rank[non_zero] = 64 - np.floor(np.log2(remaining[non_zero].astype(np.float64))).astype(np.uint8)
+        np.maximum.at(self._registers, index, rank)
+
+    def count(self) -> int:
+        registers = len(self._registers)
+        alpha = 0.7213 / (1 + 1.079 / registers)
+        estimate = alpha * registers * registers / np.sum(np.exp2(-self._registers.astype(np.float64)))
+        empty_registers = int(np.count_nonzero(self._registers == 0))
+        if estimate <= 2.5 * registers and empty_registers:
+            # Linear counting is more accurate while many registers are still empty.
+            estimate = registers * math.log(registers / empty_registers)
+        return int(round(estimate))
+
+class CountMinSketch:
+    # Frequency estimates that never undercount; the overcount is at most e / width of the total.
+
+    def __init__(self, width: int = 16384, depth: int = 4, seed: int = 42):
+        self._width_bits = max(1, int(math.ceil(math.log2(width))))
+        self.width = 1 << self._width_bits
+        rng = np.random.default_rng(seed)
+        self._multipliers = rng.integers(1, 2**63, size=depth, dtype=np.uint64) | np.uint64(1)
+        self._offsets = rng.integers(0, 2**63, size=depth, dtype=np.uint64)
+        self._table = np.zeros((depth, self.width), dtype=np.int64)
+        self.total = 0
+
+    def _indexes(self, hashes: np.ndarray, row: int) -> np.ndarray:
+        shift = np.uint64(64 - self._width_bits)
+        return ((hashes * self._multipliers[row] + self._offsets[row]) >> shift).astype(np.int64)
+
+    def add(self, hashes: np.ndarray):
+        self.total += len(hashes)
+        for row in range(len(self._table)):
+            self._table[row] += np.bincount(self._indexes(hashes, row), minlength=self.width)
+
+    def estimate(self, hashes: np.ndarray) -> np.ndarray:
+        return np.min([self._table[row][self._indexes(hashes, row)] for row in range(len(self._table))], axis=0)
+
+class DuplicateSketch:
+    # Duplicate values, counted exactly; reported per chunk until the detector spills.
+
+    def __init__(self, memory_limit: int = 5_000_000, spill_dir: str = None):
+        self._detector = DuplicateDetector(memory_limit, spill_dir)
+
+    def update(self, series: pd.Series) -> int:
+        return self._detector.add(hash_values(series))
+
+    def finish(self) -> tuple:
+        return self._detector.finish(), {}, None
+
+    def close(self):
+        self._detector.close()
+
+class DistinctSketch:
+    # Estimated number of distinct values, failing outside [min, max] when bounds are set.
+
+    def __init__(self, precision: int = 14, min_value: int = None, max_value: int = None):
+        self._hyperloglog = HyperLogLog(precision)
+        self._min_value = min_value
+        self._max_value = max_value
+
+    def update(self, series: pd.Series) -> int:
+        self._hyperloglog.add(hash_values(series))
+        return 0
+
+    def finish(self) -> tuple:
+        estimate = self._hyperloglog.count()
+        within_bounds = (self._min_value is None or estimate >= self._min_value) and (self._max_value is None or estimate <= self._max_value)
+        return estimate, {"distinct_estimate": estimate}, "SUCCESS" if within_bounds else "FAILURE"
+
+    def close(self):
+        pass
+
+class HeavyHitterSketch:
+    # Counts the values holding more than max_share of the non-null rows. Candidates are the most
+    # frequent values of each chunk, re-estimated against the count-min sketch of the whole stream.
+
+    def __init__(self, max_share: float = 0.01, top_k: int = 10, width: int = 16384, depth: int = 4):
+        self._sketch = CountMinSketch(width, depth)
+        self._max_share = max_share
+        self._top_k = top_k
+        self._candidates = {}
+
+    def update(self, series: pd.Series) -> int:
+        values = series.dropna()
+        hashes = hash_values(series)
+        if len(hashes) == 0:
+            return 0
+        self._sketch.add(hashes)
+        unique_hashes, first_index, counts = np.unique(hashes, return_index=True, return_counts=True)
+        top = np.argsort(counts)[::-1][: self._top_k]
+        for position in top:
+            self._candidates.setdefault(int(unique_hashes[position]), values.iloc[int(first_index[position])])
+        if len(self._candidates) > self._top_k:
+            candidate_hashes = np.fromiter(self._candidates, dtype=np.uint64, count=len(self._candidates))
+            estimates = self._sketch.estimate(candidate_hashes)
+            keep = set(candidate_hashes[np.argsort(estimates)[::-1][: self._top_k]].tolist())
+            self._candidates = {key: value for key, value in self._candidates.items() if key in keep}
+        return 0
+
+    def finish(self) -> tuple:
+        if not self._candidates or not self._sketch.total:
+            return 0, {}, None
+        candidate_hashes = np.fromiter(self._candidates, dtype=np.uint64, count=len(self._candidates))
+        estimates = self._sketch.estimate(candidate_hashes)
+        order = np.argsort(estimates)[::-1]
+        top_values = [(self._candidates[int(candidate_hashes[position])], int(estimates[position])) for position in order]
+        heavy_hitters = [(value, count) for value, count in top_values if count > self._max_share * self._sketch.total]
+        details = {"top_values": ", ".join(f"{value}={count}" for value, count in top_values)}
+        return len(heavy_hitters), details, None
+
+    def close(self):
+        pass
+
+SKETCHES = {
+    "duplicate": DuplicateSketch,
+    "distinct": DistinctSketch,
+    "heavy_hitters": HeavyHitterSketch,
+}
+
+def create_sketch(kind: str, options: dict):
+    return SKETCHES[kind](**options)
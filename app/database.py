@@ -1,10 +1,48 @@
+import os
+import glob
+import json
+import uuid
+import queue
 import logging
-from sqlalchemy import create_engine
+import threading
+import importlib.util
+from urllib.parse import quote_plus
+from typing import Dict
+from sqlalchemy import create_engine, inspect, types
+from sqlalchemy.engine import Engine, make_url
 import pandas as pd
 from abc import ABC, abstractmethod
 
 logger = logging.getLogger("QUALITY_CHECKS")
 
+DATABASE_TYPES = ("mysql", "postgresql", "sqlite", "duckdb")
+FINGERPRINT_METHODS = ("checksum", "metadata", "probe")
+
+class EngineRegistry:
+    # Process-wide engines keyed on connection parameters, so every controller on the same
+    # database shares one connection pool across controllers and runs.
+
+    __engines: Dict[tuple, Engine] = {}
+    __lock = threading.Lock()
+
+    @classmethod
+    def get_engine(cls, connection_string: str, **engine_options) -> Engine:
+        key = (connection_string, tuple(sorted(engine_options.items())))
+        with cls.__lock:
+            if key not in cls.__engines:
+                cls.__engines[key] = create_engine(connection_string, **engine_options)
+                logger.info(f"Engine created for {make_url(connection_string).render_as_string(hide_password=True)}.")
+            return cls.__engines[key]
+
+    @classmethod
+    def dispose_all(cls):
+        with cls.__lock:
+            for engine in cls.__engines.values():
+                engine.dispose()
+            logger.info(f"Disposed {len(cls.__engines)} database engines.")
+            cls.__engines = {}
+        DuckDBDatabaseFactory.close_all()
+
 class DatabaseFactory(ABC):
     @abstractmethod
     def create_engine(self):
@@ -14,32 +52,370 @@ class DatabaseFactory(ABC):
     def create_connection(self):
         pass
 
+    def create_streaming_cursor(self, conn):
+        return conn.cursor()
+
+    def fetch_chunks(self, conn, query: str, chunksize: int, dtypes: dict = None, chunk_sizer=None):
+        if chunk_sizer is None:
+            return pd.read_sql(query, conn, chunksize=chunksize, dtype=dtypes)
+        return self._fetch_sized_chunks(conn, query, chunk_sizer, dtypes)
+
+    def _fetch_sized_chunks(self, conn, query: str, chunk_sizer, dtypes: dict = None):
+        # The same chunks read_sql builds from fetchmany, but every fetch asks the sizer for its row count.
+        cursor = self.create_streaming_cursor(conn)
+        try:
+            cursor.execute(query)
+            columns = None
+            while True:
+                rows = cursor.fetchmany(chunk_sizer.size)
+                if not rows:
+                    return
+                if columns is None:
+                    columns = [description[0] for description in cursor.description]
+                chunk_sizer.observe_row_buffer(rows)
+                chunk = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+                del rows
+                yield chunk.astype(dtypes) if dtypes else chunk
+        finally:
+            cursor.close()
+
+    def arrow_available(self) -> bool:
+        return importlib.util.find_spec("pyarrow") is not None and importlib.util.find_spec("connectorx") is not None
+
+    def fetch_arrow_batches(self, query: str, chunksize: int):
+        # connectorx builds the Arrow buffers straight from the driver result, without Python row tuples.
+        import connectorx as cx
+
+        reader = cx.read_sql(self.connection_uri(), query, return_type="arrow_stream", batch_size=chunksize)
+        for batch in reader:
+            yield batch
+
+    def get_column_dtypes(self, engine, table_name: str) -> dict:
+        dtypes = {}
+        for column in inspect(engine).get_columns(table_name):
+            dtype = to_pandas_dtype(column["type"])
+            if dtype:
+                dtypes[column["name"]] = dtype
+        return dtypes
+
+    def sample_predicate(self, fraction: float) -> str:
+        # Row-level Bernoulli sample, evaluated by the server while it scans the table.
+        return f"RAND() < {float(fraction)}"
+
+    def fingerprint_query(self, table_name: str, method: str, key_column: str = None):
+        # The row count and highest key; an in-place update that keeps both goes unnoticed.
+        if method == "probe":
+            max_key = f", MAX({key_column})" if key_column else ""
+            return f"SELECT COUNT(*){max_key} FROM {table_name}"
+        return None
+
+    @abstractmethod
+    def connection_uri(self) -> str:
+        pass
+
 class MySQLDatabaseFactory(DatabaseFactory):
 
-    def __init__(self, db_user, db_password, db_host, db_port, db_name, conn_idle_timeout):
+    def __init__(self, db_user, db_password, db_host, db_port, db_name, conn_idle_timeout, pool_size=5, max_overflow=10):
         self.connection_string = (f"mysql+pymysql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}")
+        self.arrow_connection_string = (f"mysql://{quote_plus(str(db_user))}:{quote_plus(str(db_password))}@{db_host}:{db_port}/{db_name}")
+        self.conn_idle_timeout = conn_idle_timeout
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+
+    def create_engine(self):
+        return EngineRegistry.get_engine(
+            self.connection_string,
+            pool_recycle=self.conn_idle_timeout,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_pre_ping=True,
+        )
+
+    def create_connection(self):
+        conn = self.create_engine().raw_connection()
+        logger.info("MySQL connection checked out.")
+        return conn
+
+    def create_streaming_cursor(self, conn):
+        # Unbuffered cursor, rows are read from the socket instead of being buffered on the client first.
+        from pymysql.cursors import SSCursor
+        return conn.cursor(SSCursor)
+
+    def fingerprint_query(self, table_name: str, method: str, key_column: str = None):
+        if method == "checksum":
+            # Computed over every row, but on the server and without sending any row to the client.
+            return f"CHECKSUM TABLE {table_name}"
+        if method == "metadata":
+            # UPDATE_TIME stays NULL until the table is modified after a server restart.
+            escaped = table_name.replace("'", "''")
+            return (
+                f"SELECT UPDATE_TIME, (SELECT COUNT(*) FROM {table_name}) FROM information_schema.tables "
+                f"WHERE table_schema = DATABASE() AND table_name = '{escaped}'"
+            )
+        return super().fingerprint_query(table_name, method, key_column)
+
+    def connection_uri(self) -> str:
+        return self.arrow_connection_string
+
+class SQLiteDatabaseFactory(DatabaseFactory):
+
+    def __init__(self, db_name, conn_idle_timeout):
+        # db_name is the path of the database file.
+        self.db_path = os.path.abspath(db_name)
+        self.connection_string = f"sqlite:///{self.db_path}"
+        self.conn_idle_timeout = conn_idle_timeout
+
+    def create_engine(self):
+        return EngineRegistry.get_engine(self.connection_string)
+
+    def create_connection(self):
+        conn = self.create_engine().raw_connection()
+        logger.info("SQLite connection checked out.")
+        return conn
+
+    def sample_predicate(self, fraction: float) -> str:
+        # SQLite has no RAND(); RANDOM() is a signed 64-bit integer.
+        return f"ABS(RANDOM() % 1000000) < {int(float(fraction) * 1000000)}"
+
+    def connection_uri(self) -> str:
+        return f"sqlite://{self.db_path}"
+
+class PostgreSQLDatabaseFactory(DatabaseFactory):
+
+    def __init__(self, db_user, db_password, db_host, db_port, db_name, conn_idle_timeout, pool_size=5, max_overflow=10):
+        credentials = f"{quote_plus(str(db_user))}:{quote_plus(str(db_password))}@{db_host}:{db_port}/{db_name}"
+        self.connection_string = f"postgresql+psycopg2://{credentials}"
+        self.arrow_connection_string = f"postgresql://{credentials}"
         self.conn_idle_timeout = conn_idle_timeout
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
 
     def create_engine(self):
-        engine = create_engine(self.connection_string, pool_recycle=self.conn_idle_timeout)
-        logger.info("MySQL engine created.")
-        return engine
+        return EngineRegistry.get_engine(
+            self.connection_string,
+            pool_recycle=self.conn_idle_timeout,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_pre_ping=True,
+        )
 
     def create_connection(self):
         conn = self.create_engine().raw_connection()
-        logger.info("MySQL connection established.")
+        logger.info("PostgreSQL connection checked out.")
+        return conn
+
+    def create_streaming_cursor(self, conn):
+        # Named cursors live on the server, rows are sent as they are fetched instead of all at once on execute.
+        return conn.cursor(name=f"quality_checks_{uuid.uuid4().hex}")
+
+    def fetch_chunks(self, conn, query: str, chunksize: int, dtypes: dict = None, chunk_sizer=None):
+        # COPY streams the result as CSV through a pipe and pandas parses it in C, so no Python tuple is built
+        # per row and the client never holds more than the pipe buffer and the current chunk.
+        read_fd, write_fd = os.pipe()
+        errors = []
+
+        def copy():
+            try:
+                with os.fdopen(write_fd, "wb") as pipe:
+                    cursor = conn.cursor()
+                    try:
+                        cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true, NULL '\\N')", pipe)
+                    finally:
+                        cursor.close()
+            except Exception as e:
+                errors.append(e)
+
+        copy_thread = threading.Thread(target=copy, name="postgresql-copy", daemon=True)
+        copy_thread.start()
+        try:
+            with os.fdopen(read_fd, "rb") as pipe:
+                try:
+                    with pd.read_csv(
+                        pipe,
+                        chunksize=chunksize,
+                        dtype=dtypes,
+                        na_values=["\\N"],
+                        keep_default_na=False,
+                        true_values=["t"],
+                        false_values=["f"],
+                    ) as reader:
+                        while True:
+                            try:
+                                chunk = reader.get_chunk(chunk_sizer.size if chunk_sizer else chunksize)
+                            except StopIteration:
+                                break
+                            yield chunk
+                            del chunk
+                except pd.errors.EmptyDataError:
+                    # COPY failed before writing the header; its error is raised below.
+                    pass
+        finally:
+            # Closing the read end first makes an abandoned COPY fail on a broken pipe instead of blocking.
+            copy_thread.join()
+        if errors:
+            raise errors[0]
+
+    def sample_predicate(self, fraction: float) -> str:
+        return f"random() < {float(fraction)}"
+
+    def fingerprint_query(self, table_name: str, method: str, key_column: str = None):
+        if method == "metadata":
+            # Cumulative write counters of the table; a statistics reset only causes a cache miss.
+            escaped = table_name.replace("'", "''")
+            return (
+                f"SELECT n_tup_ins, n_tup_upd, n_tup_del, (SELECT COUNT(*) FROM {table_name}) FROM pg_stat_user_tables "
+                f"WHERE relid = '{escaped}'::regclass"
+            )
+        return super().fingerprint_query(table_name, method, key_column)
+
+    def connection_uri(self) -> str:
+        return self.arrow_connection_string
+
+class DuckDBDatabaseFactory(DatabaseFactory):
+    # db_name is a DuckDB database file, or a directory whose Parquet and CSV files are queried in place
+    # through views named after them (products.parquet, products.csv or products/*.parquet -> products).
+
+    __databases = {}
+    __lock = threading.Lock()
+
+    def __init__(self, db_name, conn_idle_timeout):
+        self.db_path = os.path.abspath(db_name)
+        self.conn_idle_timeout = conn_idle_timeout
+
+    def create_engine(self):
+        # DuckDB is queried through its own connections; there is no SQLAlchemy engine to pool.
+        return None
+
+    def _database(self):
+        import duckdb
+
+        with DuckDBDatabaseFactory.__lock:
+            database = DuckDBDatabaseFactory.__databases.get(self.db_path)
+            if database is None:
+                if os.path.isdir(self.db_path):
+                    database = duckdb.connect(":memory:")
+                    for view_name, source in self._file_sources(self.db_path).items():
+                        database.execute(f'CREATE VIEW "{view_name}" AS SELECT * FROM {source}')
+                    logger.info(f"DuckDB views created over the files in {self.db_path}.")
+                else:
+                    database = duckdb.connect(self.db_path, read_only=True)
+                DuckDBDatabaseFactory.__databases[self.db_path] = database
+            return database
+
+    @staticmethod
+    def _file_sources(directory: str) -> dict:
+        sources = {}
+        for entry in sorted(os.listdir(directory)):
+            path = os.path.join(directory, entry).replace("'", "''")
+            name, extension = os.path.splitext(entry)
+            if extension == ".parquet":
+                sources[name] = f"read_parquet('{path}')"
+            elif extension == ".csv":
+                sources[name] = f"read_csv_auto('{path}')"
+            elif os.path.isdir(os.path.join(directory, entry)) and glob.glob(os.path.join(directory, entry, "**", "*.parquet"), recursive=True):
+                sources[entry] = f"read_parquet('{path}/**/*.parquet', hive_partitioning = true)"
+        return sources
+
+    def create_connection(self):
+        # Each cursor is a separate connection to the shared database, safe to use from its own thread.
+        conn = self._database().cursor()
+        logger.info("DuckDB connection opened.")
         return conn
 
-def get_database_factory(db_type, db_user, db_password, db_host, db_port, db_name, conn_idle_timeout) -> DatabaseFactory:
+    def fetch_chunks(self, conn, query: str, chunksize: int, dtypes: dict = None, chunk_sizer=None):
+        # DuckDB reads only the selected columns and row groups of the files and returns columnar vectors of
+        # 2048 rows, so chunks are built without Python row tuples.
+        conn.execute(query)
+        while True:
+            vectors_per_chunk = max(1, (chunk_sizer.size if chunk_sizer else chunksize) // 2048)
+            chunk = conn.fetch_df_chunk(vectors_per_chunk)
+            if chunk.empty:
+                return
+            yield chunk.astype(dtypes) if dtypes else chunk
+
+    def arrow_available(self) -> bool:
+        return importlib.util.find_spec("pyarrow") is not None
+
+    def fetch_arrow_batches(self, query: str, chunksize: int):
+        conn = self.create_connection()
+        try:
+            for batch in conn.execute(query).fetch_record_batch(chunksize):
+                yield batch
+        finally:
+            conn.close()
+
+    def get_column_dtypes(self, engine, table_name: str) -> dict:
+        conn = self.create_connection()
+        try:
+            columns = conn.execute(f"DESCRIBE {table_name}").fetchall()
+        finally:
+            conn.close()
+        dtypes = {}
+        for column in columns:
+            dtype = duckdb_to_pandas_dtype(column[1])
+            if dtype:
+                dtypes[column[0]] = dtype
+        return dtypes
+
+    def sample_predicate(self, fraction: float) -> str:
+        return f"random() < {float(fraction)}"
+
+    def connection_uri(self) -> str:
+        return f"duckdb://{self.db_path}"
+
+    @classmethod
+    def close_all(cls):
+        with cls.__lock:
+            for database in cls.__databases.values():
+                database.close()
+            cls.__databases = {}
+
+def get_database_factory(db_type, db_user, db_password, db_host, db_port, db_name, conn_idle_timeout, pool_size=5, max_overflow=10) -> DatabaseFactory:
     if db_type == "mysql":
-        return MySQLDatabaseFactory(db_user, db_password, db_host, db_port, db_name, conn_idle_timeout)
-    else:
-        # Add support for other database types here
-        pass
+        return MySQLDatabaseFactory(db_user, db_password, db_host, db_port, db_name, conn_idle_timeout, pool_size, max_overflow)
+    elif db_type == "postgresql":
+        return PostgreSQLDatabaseFactory(db_user, db_password, db_host, db_port, db_name, conn_idle_timeout, pool_size, max_overflow)
+    elif db_type == "sqlite":
+        return SQLiteDatabaseFactory(db_name, conn_idle_timeout)
+    elif db_type == "duckdb":
+        return DuckDBDatabaseFactory(db_name, conn_idle_timeout)
+    raise ValueError(f"Unsupported db_type {db_type!r}, expected one of {', '.join(DATABASE_TYPES)}.")
+
+def to_pandas_dtype(sql_type):
+    # Compact pandas dtypes for the SQL column types; None leaves the column to pandas' inference.
+    if isinstance(sql_type, types.Boolean):
+        return "boolean"
+    if isinstance(sql_type, types.BigInteger) or getattr(sql_type, "unsigned", False):
+        return "Int64"
+    if isinstance(sql_type, types.Integer):
+        return "Int32"
+    if isinstance(sql_type, types.Float) and type(sql_type).__name__.upper() == "FLOAT":
+        return "float32"
+    if isinstance(sql_type, types.Numeric):
+        return "float64"
+    if isinstance(sql_type, types.String):
+        return "category"
+    return None
+
+def duckdb_to_pandas_dtype(type_name: str):
+    # The same mapping as to_pandas_dtype, for the type names reported by DuckDB's DESCRIBE.
+    if type_name == "BOOLEAN":
+        return "boolean"
+    if type_name in ("BIGINT", "UBIGINT", "UINTEGER"):
+        return "Int64"
+    if type_name in ("INTEGER", "SMALLINT", "TINYINT", "USMALLINT", "UTINYINT"):
+        return "Int32"
+    if type_name == "FLOAT":
+        return "float32"
+    if type_name == "DOUBLE" or type_name.startswith("DECIMAL"):
+        return "float64"
+    if type_name == "VARCHAR":
+        return "category"
+    return None
 
 class Database:
-    def __init__(self, db_type, db_user, db_password, db_host, db_port, db_name, conn_idle_timeout):
-        self.db_factory = get_database_factory(db_type, db_user, db_password, db_host, db_port, db_name, conn_idle_timeout)
+    def __init__(self, db_type, db_user, db_password, db_host, db_port, db_name, conn_idle_timeout, pool_size=5, max_overflow=10):
+        self.db_factory = get_database_factory(db_type, db_user, db_password, db_host, db_port, db_name, conn_idle_timeout, pool_size, max_overflow)
         self.engine = self.db_factory.create_engine()
 
     def open_connection(self):
@@ -49,7 +425,27 @@ class Database:
         logger.info("Closing database connection.")
         conn.close()
 
-    def fetch_table_in_chunks(self, conn, chunksize: int, table_name: str, columns: list = None, where_clause: str = None):
+    def get_column_dtypes(self, table_name: str) -> dict:
+        return self.db_factory.get_column_dtypes(self.engine, table_name)
+
+    def fetch_table_in_chunks(self, conn, chunksize: int, table_name: str, columns: list = None, where_clause: str = None, dtypes: dict = None, chunk_sizer=None):
+        query = self._build_select_query(table_name, columns, where_clause)
+        return self.db_factory.fetch_chunks(conn, query, chunksize, dtypes, chunk_sizer)
+
+    def arrow_available(self) -> bool:
+        return self.db_factory.arrow_available()
+
+    def fetch_arrow_batches(self, chunksize: int, table_name: str, columns: list = None, where_clause: str = None):
+        query = self._build_select_query(table_name, columns, where_clause)
+        return self.db_factory.fetch_arrow_batches(query, chunksize)
+
+    def fetch_arrow_chunks(self, chunksize: int, table_name: str, columns: list = None, where_clause: str = None):
+        # Arrow-backed pandas columns, so the controls never see object arrays.
+        for batch in self.fetch_arrow_batches(chunksize, table_name, columns, where_clause):
+            yield batch.to_pandas(types_mapper=pd.ArrowDtype)
+
+    @staticmethod
+    def _build_select_query(table_name: str, columns: list = None, where_clause: str = None) -> str:
         select_columns = "*"
         if columns:
             select_columns = ", ".join([f"{col}" for col in columns])
@@ -57,5 +453,196 @@ class Database:
         query = f"SELECT {select_columns} FROM {table_name}"
         if where_clause:
             query += f" WHERE {where_clause}"
+        return query
+
+    def fetch_max_value(self, conn, table_name: str, column: str, where_clause: str = None):
+        query = f"SELECT MAX({column}) FROM {table_name}"
+        if where_clause:
+            query += f" WHERE {where_clause}"
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query)
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+        return row[0]
+
+    def fetch_key_range(self, conn, table_name: str, key_column: str, where_clause: str = None) -> tuple:
+        query = f"SELECT MIN({key_column}), MAX({key_column}) FROM {table_name}"
+        if where_clause:
+            query += f" WHERE {where_clause}"
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query)
+            min_key, max_key = cursor.fetchone()
+        finally:
+            cursor.close()
+        return min_key, max_key
+
+    def sample_predicate(self, fraction: float) -> str:
+        return self.db_factory.sample_predicate(fraction)
+
+    def fetch_fingerprint(self, conn, table_name: str, method: str = "probe", key_column: str = None):
+        # A cheap summary of the table that changes when its rows change; None when the database has none to offer.
+        if method not in FINGERPRINT_METHODS:
+            raise ValueError(f"Unknown fingerprint method {method!r}, expected one of {', '.join(FINGERPRINT_METHODS)}.")
+        query = self.db_factory.fingerprint_query(table_name, method, key_column)
+        if query is None:
+            return None
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query)
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+        # A checksum or update time of NULL means the database does not know, which must not match a previous NULL.
+        if row is None or (method != "probe" and None in row):
+            return None
+        return json.dumps([method] + [str(value) for value in row])
+
+    def fetch_aggregates(self, conn, table_name: str, predicates: list, where_clause: str = None) -> list:
+        # Compiles every predicate into one SUM(CASE ...) so the table is scanned once on the server.
+        select_columns = ", ".join(
+            [f"COALESCE(SUM(CASE WHEN {predicate} THEN 1 ELSE 0 END), 0)" for predicate in predicates]
+        )
+        query = f"SELECT {select_columns} FROM {table_name}"
+        if where_clause:
+            query += f" WHERE {where_clause}"
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query)
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+        return [int(value) for value in row]
+
+    def scan_table(self, table_name: str, key_column: str, chunksize: int, workers: int = 1, columns: list = None, where_clause: str = None, dtypes: dict = None, chunk_sizer=None):
+        # Splits the key range into one slice per worker; each slice is read with keyset pagination
+        # over its own connection and the chunks are yielded as they arrive.
+        conn = self.open_connection()
+        try:
+            min_key, max_key = self.fetch_key_range(conn, table_name, key_column, where_clause)
+        finally:
+            self.close_connection(conn)
+        if min_key is None:
+            return
+
+        key_ranges = self._split_key_range(min_key, max_key, workers)
+        logger.info(f"Scanning {table_name} in {len(key_ranges)} key ranges of {key_column}.")
+        chunk_queue = queue.Queue(maxsize=len(key_ranges))
+        stop_event = threading.Event()
+        threads = [
+            threading.Thread(
+                target=self._scan_key_range,
+                args=(chunk_queue, stop_event, table_name, key_column, low, high, chunksize, columns, where_clause, dtypes, chunk_sizer),
+                name=f"scan-{table_name}-{index}",
+                daemon=True,
+            )
+            for index, (low, high) in enumerate(key_ranges)
+        ]
+        for thread in threads:
+            thread.start()
+
+        finished = 0
+        try:
+            while finished < len(threads):
+                item = chunk_queue.get()
+                if item is None:
+                    finished += 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+                    del item
+        finally:
+            stop_event.set()
+            for thread in threads:
+                thread.join()
+
+    @staticmethod
+    def _split_key_range(min_key, max_key, workers: int) -> list:
+        if workers <= 1 or not isinstance(min_key, int) or not isinstance(max_key, int):
+            return [(min_key, max_key)]
+        step = max((max_key - min_key + 1) // workers, 1)
+        key_ranges = []
+        low = min_key
+        while low <= max_key:
+            high = min(low + step - 1, max_key)
+            if len(key_ranges) == workers - 1:
+                high = max_key
+            key_ranges.append((low, high))
+            low = high + 1
+        return key_ranges
+
+    def _scan_key_range(self, chunk_queue, stop_event, table_name, key_column, low, high, chunksize, columns, where_clause, dtypes, chunk_sizer=None):
+        conn = None
+        try:
+            conn = self.open_connection()
+            select_columns = "*"
+            if columns:
+                select_columns = ", ".join([f"{col}" for col in columns])
+                if key_column not in columns:
+                    select_columns += f", {key_column}"
+            base_filter = f" AND ({where_clause})" if where_clause else ""
+            last_key = None
+            while not stop_event.is_set():
+                page_size = chunk_sizer.size if chunk_sizer else chunksize
+                if last_key is None:
+                    key_filter = f"{key_column} >= {self._format_key(low)}"
+                else:
+                    key_filter = f"{key_column} > {self._format_key(last_key)}"
+                query = (
+                    f"SELECT {select_columns} FROM {table_name} "
+                    f"WHERE {key_filter} AND {key_column} <= {self._format_key(high)}{base_filter} "
+                    f"ORDER BY {key_column} LIMIT {int(page_size)}"
+                )
+                cursor = self.db_factory.create_streaming_cursor(conn)
+                try:
+                    cursor.execute(query)
+                    rows = cursor.fetchall()
+                    # Server-side cursors only describe their columns once rows have been fetched.
+                    result_columns = [description[0] for description in cursor.description]
+                finally:
+                    cursor.close()
+                if not rows:
+                    break
+                last_key = rows[-1][result_columns.index(key_column)]
+                is_last_page = len(rows) < page_size
+                if chunk_sizer:
+                    chunk_sizer.observe_row_buffer(rows)
+                chunk = pd.DataFrame.from_records(rows, columns=result_columns, coerce_float=True)
+                del rows
+                if dtypes:
+                    chunk = chunk.astype({column: dtype for column, dtype in dtypes.items() if column in chunk.columns})
+                self._put(chunk_queue, stop_event, chunk)
+                del chunk
+                if is_last_page:
+                    break
+        except Exception as e:
+            logger.error(f"Error while scanning {table_name} between {low} and {high}: {e}")
+            self._put(chunk_queue, stop_event, e)
+        finally:
+            if conn:
+                self.close_connection(conn)
+            self._put(chunk_queue, stop_event, None)
+
+    @staticmethod
+    def _format_key(value) -> str:
+        if isinstance(value, (int, float)):
+            return str(value)
+        escaped = str(value).replace("'", "''")
+        return f"'{escaped}'"
 
-        return pd.read_sql(query, conn, chunksize=chunksize)
+    @staticmethod
+    def _put(chunk_queue, stop_event, item):
+        # Blocks while the consumer is behind, which bounds memory to roughly one chunk per worker.
+        while not stop_event.is_set():
+            try:
+                chunk_queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
@@ -1,14 +1,40 @@
 import time
+import queue
 import logging
-from database import Database
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+# database, the control plan and sampling pull in pandas, numpy and SQLAlchemy; they are imported where a
+# table is scanned, so building controllers and planning a run stay fast.
 from controllers.controller_factory import ControllerFactory
-from assertion_handler import AssertionHandler
+from controllers.rules import SKETCH_KINDS
+from publisher import AssertionPublisher
+from metrics import MetricsCollector
+from state_store import StateStore
+from result_cache import ResultCache
+from history_store import HistoryStore
+from chunk_sizing import AdaptiveChunkSizer
 
 logger = logging.getLogger("quality_cheks")
 
 class Executor:
-    def __init__(self, config):
+    # What a cache hit restores on each control of the executor feed.
+    CACHED_CONTROL_KEYS = ("result", "rows", "status", "sample", "details", "anomaly")
+
+    def __init__(self, config, publish: bool = True):
         self._config = config
+        self._publish = publish
+        execution_config = config.get("execution") or {}
+        self._max_workers = execution_config.get("max_workers", 1)
+        self._max_workers_per_host = execution_config.get("max_workers_per_host")
+        self._publish_workers = execution_config.get("publish_workers", 1)
+        self._publish_queue_size = execution_config.get("publish_queue_size", max(self._max_workers, 1))
+        self._host_semaphores = {}
+        self._host_semaphores_lock = threading.Lock()
+        self._state_store = self._init_state_store()
+        self._result_cache = self._init_result_cache()
+        self._history_store = self._init_history_store()
+        self._metrics = MetricsCollector(**(config.get("metrics") or {}))
+        self._publisher = AssertionPublisher(metrics=self._metrics, **(config.get("publishing") or {}))
         self._controllers = self._init_controllers()
 
     def _init_controllers(self):
@@ -19,11 +45,196 @@ class Executor:
             self._controllers.append(controller)
         return self._controllers
 
+    @property
+    def controllers(self) -> list:
+        return self._controllers
+
+    def reload(self, config):
+        # Swaps in new controllers; engines, DataHub clients and metrics stay warm. Every controller is
+        # built before anything is replaced, so a bad config leaves the running one untouched.
+        controllers = [ControllerFactory.create_controller(dict(controller_config)) for controller_config in config["controllers"]]
+        self._config = config
+        self._controllers = controllers
+        self._state_store = self._init_state_store()
+        self._result_cache = self._init_result_cache()
+        self._history_store = self._init_history_store()
+        logger.info(f"Reloaded {len(controllers)} controllers.")
+        return controllers
+
+    def _init_state_store(self):
+        if not any(controller_config.get("watermark_column") for controller_config in self._config["controllers"]):
+            return None
+        state_store_config = self._config.get("state_store") or {}
+        return StateStore(state_store_config.get("path", StateStore.DEFAULT_PATH))
+
+    def _init_result_cache(self):
+        if not any(controller_config.get("fingerprint") for controller_config in self._config["controllers"]):
+            return None
+        return ResultCache(**(self._config.get("result_cache") or {}))
+
+    def _init_history_store(self):
+        # History is kept when the config has a history section or a controller needs it for anomaly detection.
+        history_config = self._config.get("history")
+        if history_config is None and not any(controller_config.get("anomaly_detection") for controller_config in self._config["controllers"]):
+            return None
+        return HistoryStore(**(history_config or {}))
+
     def execute_controllers(self) -> float:
         start_time = time.time()
-        for controller in self._controllers:
-            conn = None
+        self._run_controllers(self._execute_controller)
+        end_time = time.time()
+        elapsed_time = round(end_time - start_time, 2)
+        logger.info(f"Execution time: {elapsed_time} seconds.")
+        self.export_metrics()
+        return elapsed_time
+
+    def run_pipeline(self) -> float:
+        # Scanning produces finished controllers into a bounded queue; publisher threads upsert and report
+        # each one while other tables are still being scanned. A full queue blocks the scanners (backpressure).
+        start_time = time.time()
+        publish_queue = queue.Queue(maxsize=self._publish_queue_size)
+        publishers = [
+            threading.Thread(target=self._publish_worker, args=(publish_queue,), name=f"publish-{index}")
+            for index in range(self._publish_workers)
+        ]
+        for publisher_thread in publishers:
+            publisher_thread.start()
+        try:
+            self._run_controllers(lambda controller: self._execute_and_enqueue(controller, publish_queue))
+        finally:
+            # Drains every pending publish before returning, even when scanning was interrupted.
+            for _ in publishers:
+                publish_queue.put(None)
+            for publisher_thread in publishers:
+                publisher_thread.join()
+        end_time = time.time()
+        elapsed_time = round(end_time - start_time, 2)
+        logger.info(f"Pipeline execution time: {elapsed_time} seconds.")
+        self.export_metrics()
+        return elapsed_time
+
+    def run_controller(self, controller) -> float:
+        # One scheduled run of a single controller, published as soon as it is validated.
+        start_time = time.time()
+        controller.reset()
+        self._execute_controller(controller)
+        if self._should_publish(controller):
             try:
+                self._publish_controller(controller)
+            except Exception as e:
+                logger.error(f"Error during publishing for {controller.table_name}: {e}", exc_info=True)
+        self.export_metrics()
+        return round(time.time() - start_time, 2)
+
+    @staticmethod
+    def describe_plan(controller) -> dict:
+        # What _execute_controller would do with the controller, worked out from its config alone: no
+        # connection is opened and nothing is read or written, which is what --dry-run prints.
+        if controller.sampling_method:
+            mode = f"sampled ({controller.sampling_method})"
+        elif controller.watermark_column:
+            mode = "incremental" if controller.is_additive() else "full scan (controls cannot be merged across runs)"
+        else:
+            mode = "full scan"
+        pushdown = controller.execution_mode == "pushdown" and controller.sampling_method != "reservoir"
+        controls = []
+        pandas_controls = []
+        for control in controller.executor_feed:
+            predicate = controller.get_sql_predicate(control) if pushdown else None
+            if predicate is None:
+                pandas_controls.append(control)
+            controls.append({
+                "column": control["column"],
+                "control_name": control["control_name"],
+                "check": control["rule"]["type"] if control["rule"] else control["method"],
+                "evaluated_in": "database" if predicate else "pandas",
+                "predicate": predicate,
+            })
+        return {
+            "table": MetricsCollector.table_label(controller),
+            "class_name": type(controller).__name__,
+            "db_type": controller.db_type,
+            "mode": mode,
+            "execution_mode": controller.execution_mode,
+            "fetch_backend": controller.fetch_backend,
+            "scan_key": controller.scan_key,
+            "chunk_size": controller.chunk_size,
+            "adaptive_chunking": controller.adaptive_chunking,
+            "fingerprint": controller.fingerprint,
+            "schedule": controller.schedule,
+            "anomaly_detection": controller.anomaly_detection,
+            "fetched_columns": controller.required_columns(pandas_controls) if pandas_controls else [],
+            "controls": controls,
+        }
+
+    def build_metrics_report(self) -> dict:
+        return self._metrics.build_report(self._controllers)
+
+    def _run_controllers(self, task):
+        if self._max_workers > 1 and len(self._controllers) > 1:
+            logger.info(f"Executing {len(self._controllers)} controllers with {self._max_workers} workers.")
+            with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="controller") as pool:
+                futures = {pool.submit(task, controller): controller for controller in self._controllers}
+                for future in as_completed(futures):
+                    controller = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.error(f"Worker failed for {controller.table_name}: {e}", exc_info=True)
+        else:
+            for controller in self._controllers:
+                task(controller)
+
+    def _execute_and_enqueue(self, controller, publish_queue):
+        self._execute_controller(controller)
+        if self._should_publish(controller):
+            publish_queue.put(controller)
+
+    def _should_publish(self, controller) -> bool:
+        if not self._publish:
+            return False
+        if controller.execution_metrics.get("cache_hit") and not self._result_cache.republish:
+            logger.info(f"Skipping publishing for {controller.table_name}, its results were reused from the result cache.")
+            return False
+        return True
+
+    def _publish_worker(self, publish_queue):
+        while True:
+            controller = publish_queue.get()
+            if controller is None:
+                break
+            try:
+                self._publish_controller(controller)
+            except Exception as e:
+                logger.error(f"Error during publishing for {controller.table_name}: {e}", exc_info=True)
+
+    def _publish_controller(self, controller):
+        urns = self._publisher.upsert_assertions([controller])
+        self._publisher.wait_until_readable([controller], urns)
+        self._publisher.report_assertion_results([controller])
+        logger.info(f"Published assertion results for {controller.table_name}.")
+
+    def _get_host_semaphore(self, controller):
+        if not self._max_workers_per_host:
+            return None
+        host_key = (controller.db_host, controller.db_port)
+        with self._host_semaphores_lock:
+            if host_key not in self._host_semaphores:
+                self._host_semaphores[host_key] = threading.BoundedSemaphore(self._max_workers_per_host)
+            return self._host_semaphores[host_key]
+
+    def _execute_controller(self, controller):
+        # Each call only touches its own controller's executor_feed, so workers never share results.
+        from database import Database
+
+        host_semaphore = self._get_host_semaphore(controller)
+        if host_semaphore:
+            host_semaphore.acquire()
+        conn = None
+        completed = False
+        self._metrics.start_controller(controller)
+        try:
+            with self._metrics.profile(controller):
                 db = Database(
                             db_type=controller.db_type, 
                             db_user=controller.db_user, 
@@ -31,79 +242,378 @@ class Executor:
                             db_host=controller.db_host, 
                             db_port=controller.db_port, 
                             db_name=controller.db_name, 
-                            conn_idle_timeout=controller.conn_idle_timeout)
+                            conn_idle_timeout=controller.conn_idle_timeout,
+                            pool_size=controller.pool_size,
+                            max_overflow=controller.max_overflow)
+                connection_start_time = time.perf_counter()
                 conn = db.open_connection()
-                logger.info(f"Connection to {controller.table_name} opened successfully.")
-                table_data = db.fetch_table_in_chunks(conn=conn, chunksize=controller.chunk_size, table_name=controller.table_name)
-                for chunk in table_data:
-                    for control in controller.executor_feed:
-                        result, status = getattr(controller, control["method"])(chunk, control["column"])
-                        control["result"] += result
-                        control["status"] = status
-                logger.info(f"Validation completed for {controller.table_name}.")
-            except Exception as e:
-                logger.error(f"Error during execution for {controller.table_name}: {e}", exc_info=True)
-            finally:
-                if conn:
-                    db.close_connection(conn)
-                    logger.info(f"Connection to {controller.table_name} closed.")
-        end_time = time.time()
-        elapsed_time = round(end_time - start_time, 2)
-        logger.info(f"Execution time: {elapsed_time} seconds.")
-        return elapsed_time
-
-    # Open to improvements...
-    def upsert_assertions(self): 
-        for controller in self._controllers:
-            assertion_handler = AssertionHandler(controller.datahub_server_url, controller.datahub_platform_urn)
-            try: 
-                for control in controller.executor_feed:
-                    urn = f"urn:li:assertion:{controller.table_name}-{control['control_name']}"
-                    entity_urn = controller.datahub_entity_urn
-                    assertion_type = f"quality-checks-{controller.table_name}"
-                    description = control["control_name"]
-                    field_path = control["column"]
-                    upsert_success = assertion_handler.upsert_assertion(
-                        urn=urn,
-                        entity_urn=entity_urn,
-                        assertion_type=assertion_type,
-                        description=description,
-                        field_path=field_path,
-                    )
-                    if upsert_success:
-                        logger.info(f"Upserted assertion successfully: {urn}")
+                controller.execution_metrics["connection_setup_seconds"] = round(time.perf_counter() - connection_start_time, 4)
+                logger.info(f"Connection to {controller.table_name} opened successfully in {controller.execution_metrics['connection_setup_seconds']} seconds.")
+                # The fingerprint is taken before scanning, so rows changed during the scan are seen by the next run.
+                fingerprint = self._fetch_fingerprint(controller, db, conn)
+                if fingerprint and self._load_cached_results(controller, fingerprint):
+                    logger.info(f"{controller.table_name} is unchanged, reused the cached results without scanning.")
+                else:
+                    if controller.sampling_method:
+                        self._execute_sampled(controller, db, conn)
+                    elif controller.watermark_column and self._state_store:
+                        self._execute_incremental(controller, db, conn)
                     else:
-                        logger.warning(f"Failed to upsert assertion: {urn}")
-                        time.sleep(0.1)
+                        self._scan_table(controller, db, conn)
+                    self._apply_anomaly_detection(controller)
+                    if fingerprint:
+                        self._save_cached_results(controller, fingerprint)
+                    logger.info(f"Validation completed for {controller.table_name}.")
+                completed = True
+        except Exception as e:
+            logger.error(f"Error during execution for {controller.table_name}: {e}", exc_info=True)
+        finally:
+            if conn:
+                db.close_connection(conn)
+                logger.info(f"Connection to {controller.table_name} closed.")
+            if host_semaphore:
+                host_semaphore.release()
+            self._metrics.finish_controller(controller)
+            if completed:
+                self._record_history(controller)
 
-                time.sleep(0.1)
-            except Exception as e:
-                logger.error(f"Unexpected error during upserting assertions: {e}", exc_info=True)
+    def _fetch_fingerprint(self, controller, db, conn):
+        if not controller.fingerprint:
+            return None
+        fingerprint = db.fetch_fingerprint(conn, controller.table_name, controller.fingerprint, controller.scan_key or controller.watermark_column)
+        if fingerprint is None:
+            logger.warning(f"No {controller.fingerprint} fingerprint is available for {controller.table_name}, skipping the result cache.")
+        return fingerprint
+
+    def _load_cached_results(self, controller, fingerprint: str) -> bool:
+        cached_results = self._result_cache.load(controller.result_cache_key(), fingerprint)
+        if cached_results is None:
+            return False
+        for control in controller.executor_feed:
+            control.update(cached_results[control["control_name"]])
+        controller.execution_metrics["cache_hit"] = 1
+        return True
+
+    def _save_cached_results(self, controller, fingerprint: str):
+        results = {
+            control["control_name"]: {key: control[key] for key in self.CACHED_CONTROL_KEYS if key in control}
+            for control in controller.executor_feed
+        }
+        self._result_cache.save(controller.result_cache_key(), fingerprint, results)
+
+    def _apply_anomaly_detection(self, controller):
+        # Replaces the fixed result == 0 status with one relative to each control's own history. Controls
+        # with too little history yet keep the fixed status.
+        if not controller.anomaly_detection or self._history_store is None:
+            return
+        import numpy as np
+        from anomaly import AnomalyDetector
+
+        try:
+            options = dict(controller.anomaly_detection)
+            if options.get("metric") == "rate" and controller.watermark_column:
+                # Incremental counts cover the whole table but only the new rows are counted, so a rate would be meaningless.
+                logger.warning(f"Rate anomaly detection does not apply to incremental runs of {controller.table_name}, using counts.")
+                options["metric"] = "count"
+            detector = AnomalyDetector(**options)
+            controls = [control for control in controller.executor_feed if control["status"] != "Not Run"]
+            series_keys = [controller.history_series_key(control) for control in controls]
+            history = self._history_store.load(series_keys, detector.history_length)
+            values = np.full((len(controls), detector.history_length), np.nan)
+            for index, series_key in enumerate(series_keys):
+                if history[series_key]:
+                    results, rows = zip(*history[series_key])
+                    values[index, values.shape[1] - len(results):] = detector.values(results, rows)
+            current_rows = np.array([control["rows"] for control in controls], dtype=np.float64)
+            current = detector.values([control["result"] for control in controls], current_rows)
+            baselines, scores, anomalous = detector.detect(values, current, current_rows)
+        except Exception as e:
+            logger.error(f"Anomaly detection failed for {controller.table_name}, keeping the fixed statuses: {e}", exc_info=True)
+            return
+        for control, baseline, score, is_anomalous in zip(controls, baselines, scores, anomalous):
+            if np.isnan(score):
+                continue
+            control["status"] = "FAILURE" if is_anomalous else "SUCCESS"
+            control["anomaly"] = {
+                "anomaly_method": detector.method,
+                "anomaly_metric": detector.metric,
+                "baseline": round(float(baseline), 6),
+                "anomaly_score": round(float(score), 3),
+                "anomaly_threshold": detector.threshold,
+            }
+        scored = sum(1 for control in controls if "anomaly" in control)
+        logger.info(f"Anomaly detection scored {scored} of {len(controls)} controls of {controller.table_name} against their history.")
+
+    def _record_history(self, controller):
+        if self._history_store is None:
+            return
+        metrics = controller.execution_metrics
+        cpu_seconds = metrics.get("control_cpu_seconds", {})
+        records = [
+            {
+                "series_key": controller.history_series_key(control),
+                "run_at": metrics["started_at"],
+                "table_label": MetricsCollector.table_label(controller),
+                "control_name": control["control_name"],
+                "result": control["result"],
+                "rows": control["rows"],
+                "status": control["status"],
+                "baseline": control.get("anomaly", {}).get("baseline"),
+                "score": control.get("anomaly", {}).get("anomaly_score"),
+                "sampled": 1 if control.get("sample") else 0,
+                "cpu_seconds": cpu_seconds.get(control["control_name"]),
+                "elapsed_seconds": metrics.get("elapsed_seconds"),
+                "fetch_seconds": metrics.get("fetch_seconds"),
+            }
+            for control in controller.executor_feed
+            if control["status"] != "Not Run"
+        ]
+        try:
+            self._history_store.save(records)
+        except Exception as e:
+            logger.error(f"Error recording the history of {controller.table_name}: {e}", exc_info=True)
+
+    def _scan_table(self, controller, db, conn, where_clause: str = None):
+        from controllers.control_plan import ControlPlan
+
+        controls = controller.executor_feed
+        if controller.execution_mode == "pushdown":
+            controls = self._execute_pushdown(controller, db, conn, where_clause)
+        if controls:
+            plan = ControlPlan(controller, controls)
+            try:
+                for chunk in self._observed_chunks(controller, db, conn, where_clause, controls):
+                    plan.evaluate(chunk)
+                    # Released before the next fetch instead of when the loop rebinds it.
+                    del chunk
+                plan.finish()
             finally:
-                assertion_handler.close()
-
-    # Open to improvements...
-    def report_assertion_results(self): 
-        for controller in self._controllers:
-            assertion_handler = AssertionHandler(controller.datahub_server_url, controller.datahub_platform_urn)
-            try: 
-                for control in controller.executor_feed:
-                    urn = f"urn:li:assertion:{controller.table_name}-{control['control_name']}"
-                    result_type = control["status"]
-                    properties = {"key": "count", "value": str(control["result"])}
-                    report_success = assertion_handler.report_assertion_result(
-                        urn=urn,
-                        result_type=result_type,
-                        properties=properties
-                    )
-                    if report_success:
-                        logger.info(f"Reported assertion result successfully: {urn} with status {result_type}")
-                    else:
-                        logger.warning(f"Failed to report assertion result: {urn}")
-                    time.sleep(0.1)
+                plan.close()
+                self._metrics.observe_controls(controller, plan.control_cpu_seconds)
+
+    def _observed_chunks(self, controller, db, conn, where_clause: str = None, controls: list = None):
+        # Times every fetch separately from the work done on the chunk; with adaptive chunking both are
+        # fed back to the sizer, which picks the size of the next fetch.
+        chunk_sizer = self._create_chunk_sizer(controller, db)
+        # Only the columns of the controls evaluated in pandas are fetched; the pushed-down ones were counted in SQL.
+        table_data = iter(self._fetch_chunks(controller, db, conn, controller.required_columns(controls), where_clause, chunk_sizer))
+        try:
+            while True:
+                fetch_start_time = time.perf_counter()
+                chunk = next(table_data, None)
+                if chunk is None:
+                    return
+                fetch_seconds = time.perf_counter() - fetch_start_time
+                rows = len(chunk)
+                # Measured once for the run report and the sizer, including the strings behind object columns.
+                chunk_bytes = AdaptiveChunkSizer.chunk_bytes(chunk)
+                self._metrics.observe_chunk(controller, rows, chunk_bytes, fetch_seconds)
+                process_start_time = time.perf_counter()
+                yield chunk
+                # Dropped before the next fetch, so the generator never keeps a chunk alive behind the consumer.
+                del chunk
+                if chunk_sizer:
+                    chunk_sizer.observe(rows, chunk_bytes, fetch_seconds + time.perf_counter() - process_start_time)
+        finally:
+            if chunk_sizer:
+                chunk_metrics = chunk_sizer.metrics()
+                controller.execution_metrics.update(chunk_metrics)
+                logger.info(
+                    f"Adaptive chunk sizes of {controller.table_name}: started at {chunk_metrics['chunk_size_initial']} rows, "
+                    f"ended at {chunk_metrics['chunk_size_final']} ({chunk_metrics['chunk_size_min']} to {chunk_metrics['chunk_size_max']}, "
+                    f"{chunk_metrics['chunk_size_changes']} changes)."
+                )
+
+    def _create_chunk_sizer(self, controller, db):
+        if not controller.adaptive_chunking:
+            return None
+        if controller.fetch_backend == "arrow" and db.arrow_available():
+            logger.warning(f"Adaptive chunking does not apply to the arrow fetch backend, {controller.table_name} is read in batches of {controller.chunk_size} rows.")
+            return None
+        # Parallel keyset workers each build a chunk while up to one per worker waits in the queue.
+        chunks_in_flight = 2 * controller.scan_workers + 1 if controller.scan_key else 1
+        return AdaptiveChunkSizer(controller.table_name, controller.chunk_size, chunks_in_flight=chunks_in_flight, **controller.adaptive_chunking)
 
-                time.sleep(0.1)
+    def _fetch_chunks(self, controller, db, conn, columns: list, where_clause: str = None, chunk_sizer=None):
+        if controller.fetch_backend == "arrow":
+            if db.arrow_available():
+                return db.fetch_arrow_chunks(chunksize=controller.chunk_size, table_name=controller.table_name, columns=columns, where_clause=where_clause)
+            logger.warning(f"Arrow fetch backend is not available for {controller.table_name}, falling back to pandas.")
+        dtypes = self._resolve_dtypes(controller, db, columns)
+        if controller.scan_key:
+            return db.scan_table(
+                table_name=controller.table_name,
+                key_column=controller.scan_key,
+                chunksize=controller.chunk_size,
+                workers=controller.scan_workers,
+                columns=columns,
+                where_clause=where_clause,
+                dtypes=dtypes,
+                chunk_sizer=chunk_sizer,
+            )
+        return db.fetch_table_in_chunks(conn=conn, chunksize=controller.chunk_size, table_name=controller.table_name, columns=columns, where_clause=where_clause, dtypes=dtypes, chunk_sizer=chunk_sizer)
+
+    def _resolve_dtypes(self, controller, db, columns: list) -> dict:
+        # Dtypes set in the config win; the rest are derived from the table schema.
+        dtypes = {}
+        if any(column not in controller.column_dtypes for column in columns):
+            try:
+                dtypes = db.get_column_dtypes(controller.table_name)
             except Exception as e:
-                logger.error(f"Unexpected error during reporting: {e}", exc_info=True)
+                logger.warning(f"Could not read the schema of {controller.table_name}, letting pandas infer dtypes: {e}")
+        dtypes.update(controller.column_dtypes)
+        return {column: dtypes[column] for column in columns if column in dtypes}
+
+    def _execute_incremental(self, controller, db, conn):
+        # Counts are additive, so the rows past the saved watermark are scanned and merged into the saved totals.
+        watermark_column = controller.watermark_column
+        state_key = controller.state_key()
+        state = None
+        if not controller.is_additive():
+            logger.warning(f"{controller.table_name} has controls that cannot be merged across runs, scanning the whole table.")
+        elif not controller.full_refresh:
+            state = self._state_store.load(state_key)
+        lower_clause = None
+        if state is None:
+            logger.info(f"Running full refresh for {controller.table_name}.")
+        else:
+            for control in controller.executor_feed:
+                control["result"] = state["results"].get(control["control_name"], 0)
+            lower_clause = f"{watermark_column} > {controller._sql_literal(state['watermark'])}"
+
+        # Bounding the scan by the current maximum keeps rows inserted during the scan for the next run.
+        watermark = db.fetch_max_value(conn=conn, table_name=controller.table_name, column=watermark_column, where_clause=lower_clause)
+        if watermark is None:
+            logger.info(f"No new rows past the watermark for {controller.table_name}.")
+        else:
+            watermark = self._normalize_watermark(watermark)
+            where_clause = f"{watermark_column} <= {controller._sql_literal(watermark)}"
+            if lower_clause:
+                where_clause = f"{lower_clause} AND {where_clause}"
+            self._scan_table(controller, db, conn, where_clause)
+
+        if state is not None or watermark is not None:
+            # Merged counts need their status recomputed; sketch statuses (e.g. distinct bounds) come from finish().
+            for control in controller.executor_feed:
+                kernel = controller.get_kernel(control)
+                if kernel and kernel[0] in SKETCH_KINDS:
+                    continue
+                control["status"] = controller._get_status(control["result"])
+        if watermark is not None:
+            results = {control["control_name"]: control["result"] for control in controller.executor_feed}
+            self._state_store.save(state_key, watermark, results)
+
+    def _execute_sampled(self, controller, db, conn):
+        # Every control is evaluated on a sample and its count is scaled up to the whole table.
+        from controllers.control_plan import ControlPlan
+        from sampling import ReservoirSampler, block_key_ranges, estimate_count
+
+        if controller.sampling_method == "bernoulli":
+            self._scan_table(controller, db, conn, db.sample_predicate(controller.sample_fraction))
+            scale = 1 / controller.sample_fraction
+        elif controller.sampling_method == "block":
+            if not controller.scan_key:
+                raise ValueError(f"Block sampling of {controller.table_name} requires a scan_key.")
+            min_key, max_key = db.fetch_key_range(conn=conn, table_name=controller.table_name, key_column=controller.scan_key)
+            if min_key is None:
+                return
+            key_ranges = block_key_ranges(int(min_key), int(max_key), controller.chunk_size, controller.sample_fraction)
+            where_clause = " OR ".join(f"({controller.scan_key} BETWEEN {low} AND {high})" for low, high in key_ranges)
+            self._scan_table(controller, db, conn, f"({where_clause})")
+            # The sampled blocks stand for the whole key range, which assumes the keys are roughly dense.
+            scale = (int(max_key) - int(min_key) + 1) / sum(high - low + 1 for low, high in key_ranges)
+        elif controller.sampling_method == "reservoir":
+            if controller.execution_mode == "pushdown":
+                logger.warning(f"Reservoir sampling of {controller.table_name} evaluates every control in pandas.")
+            sampler = ReservoirSampler(controller.sample_size)
+            for chunk in self._observed_chunks(controller, db, conn):
+                sampler.add(chunk)
+                del chunk
+            if sampler.rows_seen == 0:
+                return
+            plan = ControlPlan(controller, controller.executor_feed)
+            try:
+                plan.evaluate(sampler.sample)
+                plan.finish()
             finally:
-                assertion_handler.close()
+                plan.close()
+            self._metrics.observe_controls(controller, plan.control_cpu_seconds)
+            scale = sampler.rows_seen / len(sampler.sample)
+        else:
+            raise ValueError(f"Unknown sampling method: {controller.sampling_method}")
+
+        for control in controller.executor_feed:
+            kernel = controller.get_kernel(control)
+            if kernel and kernel[0] in SKETCH_KINDS:
+                # Duplicate, distinct and frequency counts do not scale with the sample, so they are reported as measured.
+                continue
+            sample_count = control["result"]
+            estimate = estimate_count(sample_count, control["rows"], control["rows"] * scale, controller.confidence_level)
+            control["result"] = estimate["estimate"]
+            control["status"] = controller._get_estimated_status(estimate["ci_low_rate"])
+            control["sample"] = {
+                "sampling_method": controller.sampling_method,
+                "sample_size": control["rows"],
+                "sample_count": sample_count,
+                "confidence_level": controller.confidence_level,
+                "ci_low": estimate["ci_low"],
+                "ci_high": estimate["ci_high"],
+                "tolerance": controller.tolerance,
+            }
+        logger.info(f"Estimated {len(controller.executor_feed)} controls of {controller.table_name} from a {controller.sampling_method} sample.")
+
+    @staticmethod
+    def _normalize_watermark(value):
+        if hasattr(value, "item"):
+            value = value.item()
+        if isinstance(value, (int, float, str)):
+            return value
+        return str(value)
+
+    def _execute_pushdown(self, controller, db, conn, where_clause: str = None) -> list:
+        pushdown_controls = []
+        predicates = []
+        fallback_controls = []
+        for control in controller.executor_feed:
+            predicate = controller.get_sql_predicate(control)
+            if predicate is None:
+                fallback_controls.append(control)
+            else:
+                pushdown_controls.append(control)
+                predicates.append(predicate)
+
+        if pushdown_controls:
+            pushdown_start_time = time.perf_counter()
+            # The trailing always-true predicate counts the rows the aggregates were computed over.
+            results = db.fetch_aggregates(conn=conn, table_name=controller.table_name, predicates=predicates + ["1 = 1"], where_clause=where_clause)
+            row_count = results.pop()
+            for control, result in zip(pushdown_controls, results):
+                control["result"] += result
+                control["rows"] = control.get("rows", 0) + row_count
+                control["status"] = controller._get_status(control["result"])
+            controller.execution_metrics["pushdown_seconds"] = round(time.perf_counter() - pushdown_start_time, 4)
+            logger.info(f"Pushed down {len(pushdown_controls)} controls for {controller.table_name}.")
+        if fallback_controls:
+            logger.info(f"Falling back to pandas for {len(fallback_controls)} controls of {controller.table_name}.")
+        return fallback_controls
+
+    def upsert_assertions(self) -> bool:
+        controllers = [controller for controller in self._controllers if self._should_publish(controller)]
+        urns = self._publisher.upsert_assertions(controllers)
+        return self._publisher.wait_until_readable(controllers, urns)
+
+    def report_assertion_results(self):
+        self._publisher.report_assertion_results([controller for controller in self._controllers if self._should_publish(controller)])
+        self.export_metrics()
+
+    def export_metrics(self) -> dict:
+        try:
+            return self._metrics.export(self._controllers)
+        except Exception as e:
+            logger.error(f"Error exporting metrics: {e}", exc_info=True)
+
+    def close(self):
+        from database import EngineRegistry
+
+        self._publisher.close()
+        EngineRegistry.dispose_all()
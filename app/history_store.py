@@ -0,0 +1,97 @@
+import time
+import logging
+import sqlite3
+import threading
+
+logger = logging.getLogger("QUALITY_CHEKS")
+
+class HistoryStore:
+    # Every run's result per control, as one time series per control. The table is clustered on
+    # (series_key, run_at), so reading the last runs of a control is an index range scan whose cost
+    # does not grow with the rest of the history.
+
+    DEFAULT_PATH = "./.quality_history.sqlite"
+
+    def __init__(self, path: str = DEFAULT_PATH, retention_days: float = 365):
+        self._path = path
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._init_schema()
+        logger.info(f"History store initialized at {self._path}.")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._path, timeout=30)
+
+    def _init_schema(self):
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        """
+                        CREATE TABLE IF NOT EXISTS control_history (
+                            series_key TEXT NOT NULL,
+                            run_at REAL NOT NULL,
+                            table_label TEXT NOT NULL,
+                            control_name TEXT NOT NULL,
+                            result REAL NOT NULL,
+                            rows INTEGER NOT NULL,
+                            status TEXT NOT NULL,
+                            baseline REAL,
+                            score REAL,
+                            sampled INTEGER NOT NULL,
+                            cpu_seconds REAL,
+                            elapsed_seconds REAL,
+                            fetch_seconds REAL,
+                            PRIMARY KEY (series_key, run_at)
+                        ) WITHOUT ROWID
+                        """
+                    )
+                    # Retention deletes and per-table reports go by time.
+                    conn.execute("CREATE INDEX IF NOT EXISTS control_history_run_at ON control_history (run_at)")
+                    conn.execute("CREATE INDEX IF NOT EXISTS control_history_table ON control_history (table_label, run_at)")
+            finally:
+                conn.close()
+
+    def load(self, series_keys: list, limit: int) -> dict:
+        # The last `limit` (result, rows) pairs of every series, oldest first.
+        history = {}
+        with self._lock:
+            conn = self._connect()
+            try:
+                for series_key in series_keys:
+                    rows = conn.execute(
+                        "SELECT result, rows FROM control_history WHERE series_key = ? ORDER BY run_at DESC LIMIT ?",
+                        (series_key, int(limit)),
+                    ).fetchall()
+                    history[series_key] = rows[::-1]
+            finally:
+                conn.close()
+        return history
+
+    def save(self, records: list):
+        # records are dicts with the control_history columns; one transaction per controller run.
+        if not records:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany(
+                        """
+                        INSERT OR REPLACE INTO control_history (
+                            series_key, run_at, table_label, control_name, result, rows, status,
+                            baseline, score, sampled, cpu_seconds, elapsed_seconds, fetch_seconds
+                        ) VALUES (
+                            :series_key, :run_at, :table_label, :control_name, :result, :rows, :status,
+                            :baseline, :score, :sampled, :cpu_seconds, :elapsed_seconds, :fetch_seconds
+                        )
+                        """,
+                        records,
+                    )
+                    if self.retention_days:
+                        conn.execute("DELETE FROM control_history WHERE run_at < ?", (now - self.retention_days * 86400,))
+            finally:
+                conn.close()
+        logger.info(f"Recorded {len(records)} control results of {records[0]['table_label']} in the history store.")
@@ -0,0 +1,234 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+import resource
+from contextlib import contextmanager
+
+logger = logging.getLogger("QUALITY_CHEKS")
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+def current_rss_bytes() -> int:
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    # Without psutil only the process peak is available; ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+class MetricsCollector:
+
+    def __init__(self, json_path: str = None, prometheus_path: str = None, profile_dir: str = "./profiles"):
+        self._json_path = json_path
+        self._prometheus_path = prometheus_path
+        self._profile_dir = profile_dir
+        self._datahub_calls = {}
+        # Resident memory belongs to the whole process; the per-controller figures only sample it while a controller runs.
+        self._peak_rss_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def table_label(controller) -> str:
+        return f"{controller.db_name}.{controller.table_name}"
+
+    # Controller metrics live in controller.execution_metrics and are only written by the controller's own worker.
+    def start_controller(self, controller):
+        rss_bytes = self.observe_rss()
+        controller.execution_metrics.update(
+            {
+                "started_at": time.time(),
+                "chunks": 0,
+                "rows": 0,
+                "bytes": 0,
+                "fetch_seconds": 0.0,
+                "start_rss_bytes": rss_bytes,
+                "peak_rss_bytes": rss_bytes,
+                "control_cpu_seconds": {},
+                "cache_hit": 0,
+            }
+        )
+
+    def observe_chunk(self, controller, rows: int, chunk_bytes: int, fetch_seconds: float):
+        metrics = controller.execution_metrics
+        metrics["chunks"] += 1
+        metrics["rows"] += rows
+        metrics["bytes"] += chunk_bytes
+        metrics["fetch_seconds"] += fetch_seconds
+        metrics["peak_rss_bytes"] = max(metrics["peak_rss_bytes"], self.observe_rss())
+
+    def observe_rss(self) -> int:
+        # Samples the process RSS, keeping the process-wide peak, and returns the sample.
+        rss_bytes = current_rss_bytes()
+        with self._lock:
+            self._peak_rss_bytes = max(self._peak_rss_bytes, rss_bytes)
+        return rss_bytes
+
+    def observe_controls(self, controller, control_cpu_seconds: dict):
+        cpu_seconds = controller.execution_metrics.setdefault("control_cpu_seconds", {})
+        for control_name, seconds in control_cpu_seconds.items():
+            cpu_seconds[control_name] = cpu_seconds.get(control_name, 0.0) + seconds
+
+    def finish_controller(self, controller):
+        metrics = controller.execution_metrics
+        metrics["elapsed_seconds"] = round(time.time() - metrics["started_at"], 4)
+        metrics["fetch_seconds"] = round(metrics["fetch_seconds"], 4)
+        metrics["rows_per_second"] = round(metrics["rows"] / metrics["elapsed_seconds"], 2) if metrics["elapsed_seconds"] else 0.0
+        # Approximate when controllers run concurrently: their memory adds up in the same process RSS.
+        metrics["peak_rss_bytes"] = max(metrics["peak_rss_bytes"], self.observe_rss())
+        metrics["peak_rss_delta_bytes"] = metrics["peak_rss_bytes"] - metrics["start_rss_bytes"]
+        logger.info(
+            f"{controller.table_name}: {metrics['rows']} rows in {metrics['chunks']} chunks, "
+            f"{metrics['elapsed_seconds']} seconds ({metrics['rows_per_second']} rows/s), "
+            f"fetch {metrics['fetch_seconds']} seconds, peak RSS {metrics['peak_rss_bytes'] / 1024 / 1024:.1f} MiB "
+            f"(+{metrics['peak_rss_delta_bytes'] / 1024 / 1024:.1f} MiB while it ran)."
+        )
+
+    def observe_datahub_call(self, operation: str, seconds: float, success: bool):
+        with self._lock:
+            call_metrics = self._datahub_calls.setdefault(operation, {"count": 0, "failures": 0, "seconds": 0.0, "max_seconds": 0.0})
+            call_metrics["count"] += 1
+            call_metrics["failures"] += 0 if success else 1
+            call_metrics["seconds"] += seconds
+            call_metrics["max_seconds"] = max(call_metrics["max_seconds"], seconds)
+
+    @contextmanager
+    def profile(self, controller):
+        if not controller.profiler:
+            yield
+            return
+        os.makedirs(self._profile_dir, exist_ok=True)
+        # SQLite database names are file paths, so the label is flattened into a single file name.
+        file_name = re.sub(r"[^\w.-]", "_", self.table_label(controller)).strip("_")
+        output_path = os.path.join(self._profile_dir, f"{file_name}.{int(time.time())}")
+        profiler_name = controller.profiler
+        if profiler_name == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                logger.warning("pyinstrument is not installed, falling back to cProfile.")
+                profiler_name = "cprofile"
+        if profiler_name == "pyinstrument":
+            profiler = Profiler()
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                with open(f"{output_path}.html", "w") as file:
+                    file.write(profiler.output_html())
+                logger.info(f"Profile for {controller.table_name} written to {output_path}.html")
+        elif profiler_name == "cprofile":
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                profiler.dump_stats(f"{output_path}.prof")
+                logger.info(f"Profile for {controller.table_name} written to {output_path}.prof")
+        else:
+            raise ValueError(f"Unknown profiler: {profiler_name}")
+
+    def build_report(self, controllers: list) -> dict:
+        with self._lock:
+            datahub_calls = {operation: dict(call_metrics) for operation, call_metrics in self._datahub_calls.items()}
+            peak_rss_bytes = self._peak_rss_bytes
+        return {
+            "generated_at": time.time(),
+            "process_peak_rss_bytes": peak_rss_bytes,
+            "controllers": [
+                {"table": self.table_label(controller), **self._snapshot(controller.execution_metrics)}
+                for controller in controllers
+            ],
+            "datahub_calls": datahub_calls,
+        }
+
+    @staticmethod
+    def _snapshot(execution_metrics: dict) -> dict:
+        # Copied first, since a controller running in another thread may still be adding to its metrics.
+        return {
+            key: dict(value) if isinstance(value, dict) else value
+            for key, value in dict(execution_metrics).items()
+            if key not in ("started_at", "start_rss_bytes")
+        }
+
+    def export(self, controllers: list):
+        report = self.build_report(controllers)
+        if self._json_path:
+            self._write(self._json_path, json.dumps(report, indent=2))
+            logger.info(f"Run report written to {self._json_path}.")
+        if self._prometheus_path:
+            self._write(self._prometheus_path, self.to_prometheus(report))
+            logger.info(f"Prometheus metrics written to {self._prometheus_path}.")
+        return report
+
+    @staticmethod
+    def _write(path: str, content: str):
+        # Written next to the target and renamed, so scrapers never read a half-written file.
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "w") as file:
+            file.write(content)
+        os.replace(temporary_path, path)
+
+    @staticmethod
+    def _escape_label(value) -> str:
+        return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+    @classmethod
+    def to_prometheus(cls, report: dict) -> str:
+        controller_metrics = {
+            # Every run starts these from zero, including scheduled runs in --serve, so they are gauges of the last run.
+            "rows": ("quality_checks_rows", "gauge", "Rows validated per table in the last run."),
+            "chunks": ("quality_checks_chunks", "gauge", "Chunks fetched per table in the last run."),
+            "bytes": ("quality_checks_chunk_bytes", "gauge", "In-memory bytes of the fetched chunks per table in the last run."),
+            "fetch_seconds": ("quality_checks_fetch_seconds", "gauge", "Time spent waiting on the database per table."),
+            "elapsed_seconds": ("quality_checks_elapsed_seconds", "gauge", "Wall time of the controller per table."),
+            "rows_per_second": ("quality_checks_rows_per_second", "gauge", "Validation throughput per table."),
+            "peak_rss_bytes": ("quality_checks_peak_rss_bytes", "gauge", "Peak process RSS sampled while the table ran; approximate when tables run concurrently."),
+            "peak_rss_delta_bytes": ("quality_checks_peak_rss_delta_bytes", "gauge", "Growth of the process RSS above its value when the table started; approximate when tables run concurrently."),
+            "connection_setup_seconds": ("quality_checks_connection_setup_seconds", "gauge", "Time to check out a database connection."),
+            "pushdown_seconds": ("quality_checks_pushdown_seconds", "gauge", "Time spent on the push-down aggregate query per table."),
+            "cache_hit": ("quality_checks_cache_hit", "gauge", "1 when the table was unchanged and its results came from the result cache."),
+            "chunk_size_final": ("quality_checks_chunk_size_rows", "gauge", "Rows per chunk chosen by adaptive chunking at the end of the scan."),
+            "chunk_size_min": ("quality_checks_chunk_size_min_rows", "gauge", "Smallest chunk size chosen by adaptive chunking."),
+            "chunk_size_max": ("quality_checks_chunk_size_max_rows", "gauge", "Largest chunk size chosen by adaptive chunking."),
+        }
+        lines = []
+        for key, (name, metric_type, description) in controller_metrics.items():
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} {metric_type}"]
+            for controller in report["controllers"]:
+                if key in controller:
+                    lines.append(f'{name}{{table="{cls._escape_label(controller["table"])}"}} {controller[key]}')
+
+        lines += [
+            "# HELP quality_checks_process_peak_rss_bytes Peak resident memory of the process, shared by every table it validated.",
+            "# TYPE quality_checks_process_peak_rss_bytes gauge",
+            f"quality_checks_process_peak_rss_bytes {report.get('process_peak_rss_bytes', 0)}",
+        ]
+        lines += ["# HELP quality_checks_control_cpu_seconds CPU time per control.", "# TYPE quality_checks_control_cpu_seconds gauge"]
+        for controller in report["controllers"]:
+            for control_name, seconds in controller.get("control_cpu_seconds", {}).items():
+                lines.append(
+                    f'quality_checks_control_cpu_seconds{{table="{cls._escape_label(controller["table"])}",control="{cls._escape_label(control_name)}"}} {round(seconds, 6)}'
+                )
+
+        lines += [
+            "# HELP quality_checks_datahub_call_seconds Latency of DataHub calls.",
+            "# TYPE quality_checks_datahub_call_seconds summary",
+        ]
+        for operation, call_metrics in report["datahub_calls"].items():
+            label = f'operation="{cls._escape_label(operation)}"'
+            lines.append(f"quality_checks_datahub_call_seconds_sum{{{label}}} {round(call_metrics['seconds'], 6)}")
+            lines.append(f"quality_checks_datahub_call_seconds_count{{{label}}} {call_metrics['count']}")
+        lines += ["# HELP quality_checks_datahub_call_failures_total Failed DataHub calls.", "# TYPE quality_checks_datahub_call_failures_total counter"]
+        for operation, call_metrics in report["datahub_calls"].items():
+            lines.append(f'quality_checks_datahub_call_failures_total{{operation="{cls._escape_label(operation)}"}} {call_metrics["failures"]}')
+        return "\n".join(lines) + "\n"
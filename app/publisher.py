@@ -0,0 +1,161 @@
+from __future__ import annotations
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from assertion_handler import AssertionHandler
+
+logger = logging.getLogger("QUALITY_CHEKS")
+
+class AssertionPublisher:
+
+    def __init__(self, max_workers: int = 8, max_retries: int = 3, backoff_seconds: float = 0.5, confirm_timeout_seconds: float = 30, metrics=None):
+        self._metrics = metrics
+        self._max_workers = max_workers
+        self._max_retries = max_retries
+        self._backoff_seconds = backoff_seconds
+        self._confirm_timeout_seconds = confirm_timeout_seconds
+        self._graphs = {}
+        self._graphs_lock = threading.Lock()
+
+    @staticmethod
+    def assertion_urn(controller, control: dict) -> str:
+        return f"urn:li:assertion:{controller.table_name}-{control['control_name']}"
+
+    def _get_handler(self, controller) -> AssertionHandler:
+        # One DataHubGraph client per server URL, shared by every controller and worker thread. The DataHub
+        # SDK takes about half a second to import, so it is only loaded once something is published.
+        from assertion_handler import AssertionHandler
+        with self._graphs_lock:
+            graph = self._graphs.get(controller.datahub_server_url)
+            if graph is None:
+                # Retries are handled by _with_retries, so the client's own retries are turned off.
+                graph = AssertionHandler.initialize_datahub_client(controller.datahub_server_url, retry_max_times=0)
+                if graph is not None:
+                    self._graphs[controller.datahub_server_url] = graph
+        return AssertionHandler(controller.datahub_server_url, controller.datahub_platform_urn, graph=graph)
+
+    def _timed(self, operation: str, func):
+        start_time = time.perf_counter()
+        success = func()
+        if self._metrics is not None:
+            self._metrics.observe_datahub_call(operation, time.perf_counter() - start_time, success)
+        return success
+
+    def _with_retries(self, func, description: str, operation: str) -> bool:
+        # Backs off exponentially, and only after a failed attempt.
+        for attempt in range(self._max_retries + 1):
+            if self._timed(operation, func):
+                return True
+            if attempt < self._max_retries:
+                delay = self._backoff_seconds * (2 ** attempt)
+                logger.warning(f"Retrying {description} in {delay:.2f} seconds.")
+                time.sleep(delay)
+        return False
+
+    def _run_concurrently(self, tasks: list) -> list:
+        if not tasks:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self._max_workers, len(tasks)), thread_name_prefix="publisher") as pool:
+            return list(pool.map(lambda task: task(), tasks))
+
+    def upsert_assertions(self, controllers: list) -> list:
+        tasks = []
+        for controller in controllers:
+            handler = self._get_handler(controller)
+            for control in controller.executor_feed:
+                tasks.append(self._upsert_task(handler, controller, control))
+        results = self._run_concurrently(tasks)
+        return [urn for urn, success in results if success]
+
+    def _upsert_task(self, handler: AssertionHandler, controller, control: dict):
+        urn = self.assertion_urn(controller, control)
+
+        def task():
+            success = self._with_retries(
+                lambda: handler.upsert_assertion(
+                    urn=urn,
+                    entity_urn=controller.datahub_entity_urn,
+                    assertion_type=f"quality-checks-{controller.table_name}",
+                    description=control["control_name"],
+                    field_path=control["column"],
+                ),
+                f"upsert of {urn}",
+                "upsert_assertion",
+            )
+            if success:
+                logger.info(f"Upserted assertion successfully: {urn}")
+            else:
+                logger.warning(f"Failed to upsert assertion: {urn}")
+            return urn, success
+
+        return task
+
+    def wait_until_readable(self, controllers: list, urns: list) -> bool:
+        # Replaces a fixed sleep: polls until every upserted assertion can be read back.
+        handlers = {}
+        for controller in controllers:
+            handler = self._get_handler(controller)
+            for control in controller.executor_feed:
+                handlers[self.assertion_urn(controller, control)] = handler
+        pending = [urn for urn in urns if urn in handlers]
+        deadline = time.time() + self._confirm_timeout_seconds
+        delay = self._backoff_seconds
+        while pending:
+            readable = self._run_concurrently(
+                [lambda urn=urn: self._timed("assertion_exists", lambda: handlers[urn].assertion_exists(urn)) for urn in pending]
+            )
+            pending = [urn for urn, exists in zip(pending, readable) if not exists]
+            if not pending:
+                break
+            if time.time() + delay > deadline:
+                logger.warning(f"{len(pending)} assertions are still not readable after {self._confirm_timeout_seconds} seconds.")
+                return False
+            time.sleep(delay)
+            delay *= 2
+        logger.info(f"Confirmed {len(urns)} assertions are readable.")
+        return True
+
+    def report_assertion_results(self, controllers: list) -> list:
+        tasks = []
+        for controller in controllers:
+            handler = self._get_handler(controller)
+            for control in controller.executor_feed:
+                tasks.append(self._report_task(handler, controller, control))
+        results = self._run_concurrently(tasks)
+        return [urn for urn, success in results if success]
+
+    def _report_task(self, handler: AssertionHandler, controller, control: dict):
+        urn = self.assertion_urn(controller, control)
+        result_type = control["status"]
+        properties = {"key": "count", "value": str(control["result"])}
+        for extra_properties in (control.get("sample"), control.get("details"), control.get("anomaly")):
+            if extra_properties:
+                properties.update({key: str(value) for key, value in extra_properties.items()})
+
+        def task():
+            success = self._with_retries(
+                lambda: handler.report_assertion_result(urn=urn, result_type=result_type, properties=properties),
+                f"report of {urn}",
+                "report_assertion_result",
+            )
+            if success:
+                logger.info(f"Reported assertion result successfully: {urn} with status {result_type}")
+            else:
+                logger.warning(f"Failed to report assertion result: {urn}")
+            return urn, success
+
+        return task
+
+    def close(self):
+        with self._graphs_lock:
+            for server_url, graph in self._graphs.items():
+                try:
+                    graph.close()
+                    logger.info(f"DataHub client for {server_url} closed.")
+                except Exception as e:
+                    logger.error(f"Error closing the DataHub client for {server_url}: {e}")
+            self._graphs = {}
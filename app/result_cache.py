@@ -0,0 +1,89 @@
+import json
+import time
+import logging
+import sqlite3
+import threading
+
+logger = logging.getLogger("QUALITY_CHEKS")
+
+class ResultCache:
+
+    DEFAULT_PATH = "./.quality_result_cache.sqlite"
+
+    def __init__(self, path: str = DEFAULT_PATH, ttl_seconds: float = 86400, max_entries: int = 1000, republish: bool = True):
+        self._path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # Whether results reused from the cache are reported to DataHub again.
+        self.republish = republish
+        self._lock = threading.Lock()
+        self._init_schema()
+        logger.info(f"Result cache initialized at {self._path}.")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._path, timeout=30)
+
+    def _init_schema(self):
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        """
+                        CREATE TABLE IF NOT EXISTS results (
+                            cache_key TEXT PRIMARY KEY,
+                            fingerprint TEXT NOT NULL,
+                            results TEXT NOT NULL,
+                            created_at REAL NOT NULL,
+                            used_at REAL NOT NULL
+                        )
+                        """
+                    )
+            finally:
+                conn.close()
+
+    def load(self, cache_key: str, fingerprint: str):
+        # Returns the cached control results when the table still has the same fingerprint and the entry has not expired.
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    row = conn.execute(
+                        "SELECT fingerprint, results, created_at FROM results WHERE cache_key = ?", (cache_key,)
+                    ).fetchone()
+                    if row is None or row[0] != fingerprint:
+                        return None
+                    if self.ttl_seconds and now - row[2] > self.ttl_seconds:
+                        conn.execute("DELETE FROM results WHERE cache_key = ?", (cache_key,))
+                        logger.info(f"Cached results for {cache_key} expired.")
+                        return None
+                    conn.execute("UPDATE results SET used_at = ? WHERE cache_key = ?", (now, cache_key))
+            finally:
+                conn.close()
+        return json.loads(row[1])
+
+    def save(self, cache_key: str, fingerprint: str, results: dict):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO results (cache_key, fingerprint, results, created_at, used_at) VALUES (?, ?, ?, ?, ?)",
+                        (cache_key, fingerprint, json.dumps(results, default=str), now, now),
+                    )
+                    self._evict(conn, now)
+            finally:
+                conn.close()
+        logger.info(f"Cached results for {cache_key}.")
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        # Drops expired entries, then the least recently used ones past max_entries.
+        if self.ttl_seconds:
+            conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl_seconds,))
+        if self.max_entries:
+            conn.execute(
+                "DELETE FROM results WHERE cache_key NOT IN (SELECT cache_key FROM results ORDER BY used_at DESC LIMIT ?)",
+                (int(self.max_entries),),
+            )
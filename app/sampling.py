@@ -0,0 +1,67 @@
+import math
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+
+SAMPLING_METHODS = ("bernoulli", "block", "reservoir")
+
+class ReservoirSampler:
+    # Bottom-k sampling: every row gets a uniform random priority and the k lowest priorities are kept,
+    # which gives the same uniform sample as Algorithm R while working on whole chunks at once.
+
+    def __init__(self, sample_size: int, seed: int = None):
+        self.sample_size = sample_size
+        self.rows_seen = 0
+        self._rng = np.random.default_rng(seed)
+        self._sample = None
+        self._priorities = np.empty(0)
+
+    def add(self, chunk: pd.DataFrame):
+        self.rows_seen += len(chunk)
+        priorities = self._rng.random(len(chunk))
+        if self._sample is None:
+            sample, all_priorities = chunk, priorities
+        else:
+            sample = pd.concat([self._sample, chunk], ignore_index=True)
+            all_priorities = np.concatenate([self._priorities, priorities])
+        if len(sample) > self.sample_size:
+            keep = np.argpartition(all_priorities, self.sample_size - 1)[: self.sample_size]
+            sample, all_priorities = sample.iloc[keep], all_priorities[keep]
+        self._sample = sample.reset_index(drop=True)
+        self._priorities = all_priorities
+
+    @property
+    def sample(self) -> pd.DataFrame:
+        return self._sample if self._sample is not None else pd.DataFrame()
+
+def block_key_ranges(min_key: int, max_key: int, block_size: int, fraction: float, rng: np.random.Generator = None) -> list:
+    # Picks random, non-overlapping key blocks covering roughly `fraction` of the key space.
+    rng = rng or np.random.default_rng()
+    block_count = math.ceil((max_key - min_key + 1) / block_size)
+    sampled_count = min(block_count, max(1, math.ceil(block_count * fraction)))
+    blocks = np.sort(rng.choice(block_count, size=sampled_count, replace=False))
+    return [(min_key + int(block) * block_size, min(min_key + (int(block) + 1) * block_size - 1, max_key)) for block in blocks]
+
+def wilson_interval(count: int, rows: int, confidence_level: float) -> tuple:
+    # Wilson score interval for the share of failing rows; unlike the normal approximation it stays
+    # inside [0, 1] and is usable when the sample has no, or very few, failing rows.
+    if rows == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence_level / 2)
+    rate = count / rows
+    denominator = 1 + z * z / rows
+    center = (rate + z * z / (2 * rows)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / rows + z * z / (4 * rows * rows)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+def estimate_count(count: int, rows: int, population_rows: float, confidence_level: float) -> dict:
+    low_rate, high_rate = wilson_interval(count, rows, confidence_level)
+    rate = count / rows if rows else 0.0
+    return {
+        "estimate": int(round(rate * population_rows)),
+        "ci_low": int(math.floor(low_rate * population_rows)),
+        "ci_high": int(math.ceil(high_rate * population_rows)),
+        "rate": rate,
+        "ci_low_rate": low_rate,
+        "ci_high_rate": high_rate,
+    }
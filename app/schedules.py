@@ -0,0 +1,120 @@
+import re
+from datetime import datetime, timedelta
+
+CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+}
+
+INTERVAL_PATTERN = re.compile(r"@every\s+(\d+(?:\.\d+)?)\s*([smhd]?)$")
+INTERVAL_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+MONTH_NAMES = {name: index + 1 for index, name in enumerate(["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"])}
+DAY_NAMES = {name: index for index, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+
+class IntervalSchedule:
+
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError(f"Schedule interval must be positive, got {seconds}.")
+        self.seconds = seconds
+
+    def first_run(self, now: datetime) -> datetime:
+        # Interval schedules start right away, cron schedules wait for their next slot.
+        return now
+
+    def next_after(self, moment: datetime) -> datetime:
+        return moment + timedelta(seconds=self.seconds)
+
+    def __str__(self) -> str:
+        return f"@every {self.seconds:g}s"
+
+class CronSchedule:
+    # Standard five-field cron (minute hour day-of-month month day-of-week) in local time, with lists,
+    # ranges, steps and month/day names. As in cron, a day matches either restricted day field.
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = CRON_ALIASES.get(expression, expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression {expression!r} needs 5 fields.")
+        self._minutes = self._parse_field(fields[0], 0, 59)
+        self._hours = self._parse_field(fields[1], 0, 23)
+        self._days = self._parse_field(fields[2], 1, 31)
+        self._months = self._parse_field(fields[3], 1, 12, MONTH_NAMES)
+        self._weekdays = {day % 7 for day in self._parse_field(fields[4], 0, 7, DAY_NAMES)}
+        self._days_restricted = not fields[2].startswith("*")
+        self._weekdays_restricted = not fields[4].startswith("*")
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int, names: dict = None) -> set:
+        values = set()
+        for part in field.lower().split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start_text, end_text = part.split("-", 1)
+                start, end = CronSchedule._parse_value(start_text, names), CronSchedule._parse_value(end_text, names)
+            else:
+                start = CronSchedule._parse_value(part, names)
+                end = high if step > 1 else start
+            if not low <= start <= end <= high or step < 1:
+                raise ValueError(f"Invalid cron field {field!r}, values must be between {low} and {high}.")
+            values.update(range(start, end + 1, step))
+        return values
+
+    @staticmethod
+    def _parse_value(text: str, names: dict = None) -> int:
+        if names and text in names:
+            return names[text]
+        return int(text)
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_matches = moment.day in self._days
+        weekday_matches = (moment.weekday() + 1) % 7 in self._weekdays
+        if self._days_restricted and self._weekdays_restricted:
+            return day_matches or weekday_matches
+        return day_matches and weekday_matches
+
+    def first_run(self, now: datetime) -> datetime:
+        return self.next_after(now)
+
+    def next_after(self, moment: datetime) -> datetime:
+        # Skips whole months, days and hours that cannot match, so a search takes at most a few hundred steps.
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self._months:
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self._hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self._minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression {self.expression!r} never matches.")
+
+    def __str__(self) -> str:
+        return self.expression
+
+def parse_schedule(schedule):
+    # A number of seconds, "@every <n>[s|m|h|d]", a cron alias such as "@daily" or a five-field cron expression.
+    if isinstance(schedule, (int, float)) and not isinstance(schedule, bool):
+        return IntervalSchedule(float(schedule))
+    if not isinstance(schedule, str):
+        raise ValueError(f"Invalid schedule {schedule!r}.")
+    schedule = schedule.strip()
+    match = INTERVAL_PATTERN.match(schedule)
+    if match:
+        return IntervalSchedule(float(match.group(1)) * INTERVAL_UNITS[match.group(2)])
+    return CronSchedule(schedule)
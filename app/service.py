@@ -0,0 +1,268 @@
+import os
+import json
+import time
+import signal
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import yaml
+from metrics import MetricsCollector
+from schedules import parse_schedule
+
+logger = logging.getLogger("QUALITY_CHEKS")
+
+class ScheduledJob:
+    # A scheduled controller and the outcome of its last run; kept across config reloads.
+
+    def __init__(self, key: str, controller, schedule, now: datetime):
+        self.key = key
+        self.controller = controller
+        self.schedule = schedule
+        self.next_run_at = schedule.first_run(now)
+        # Held from the moment a run is submitted until it finishes, so runs of a controller never overlap.
+        self.lock = threading.Lock()
+        self.runs = 0
+        self.skipped_runs = 0
+        self.last_started_at = None
+        self.last_finished_at = None
+        self.last_duration_seconds = None
+        self.last_status = None
+        self.last_error = None
+        self.last_results = {}
+
+    def to_dict(self) -> dict:
+        return {
+            "table": self.key,
+            "schedule": str(self.schedule),
+            "running": self.lock.locked(),
+            "next_run_at": self.next_run_at.isoformat(timespec="seconds"),
+            "runs": self.runs,
+            "skipped_runs": self.skipped_runs,
+            "last_started_at": self.last_started_at,
+            "last_finished_at": self.last_finished_at,
+            "last_duration_seconds": self.last_duration_seconds,
+            "last_status": self.last_status,
+            "last_error": self.last_error,
+            "last_results": self.last_results,
+        }
+
+class StatusRequestHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == "/health":
+            self._send(200, "application/json", json.dumps(service.health()))
+        elif self.path == "/status":
+            self._send(200, "application/json", json.dumps(service.status(), default=str))
+        elif self.path == "/metrics":
+            self._send(200, "text/plain; version=0.0.4", service.prometheus_metrics())
+        else:
+            self._send(404, "application/json", json.dumps({"error": f"Unknown path {self.path}"}))
+
+    def _send(self, status_code: int, content_type: str, body: str):
+        payload = body.encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Status endpoint: {format % args}")
+
+class QualityService:
+    # Long-running mode: one process keeps the executor, its engines and DataHub clients warm and runs every
+    # controller on its own schedule, reloading config.yaml when it changes.
+
+    def __init__(self, config_path: str, config: dict, executor, select_controllers=None):
+        self._config_path = config_path
+        self._executor = executor
+        # Applies the command line --only/--exclude filters to reloaded configs as well.
+        self._select_controllers = select_controllers
+        service_config = config.get("service") or {}
+        self._host = service_config.get("host", "127.0.0.1")
+        self._port = service_config.get("port", 8765)
+        self._tick_seconds = service_config.get("tick_seconds", 1.0)
+        self._reload_interval_seconds = service_config.get("reload_interval_seconds", 5.0)
+        self._max_workers = service_config.get("max_workers", (config.get("execution") or {}).get("max_workers", 1))
+        self._started_at = time.time()
+        self._stop_event = threading.Event()
+        self._jobs_lock = threading.Lock()
+        self._jobs = {}
+        self._config_mtime = self._read_config_mtime()
+        self._loaded_at = time.time()
+        self._reloads = 0
+        self._last_reload_error = None
+        self._pool = None
+        self._http_server = None
+        self._schedule_jobs(executor.controllers)
+
+    def _read_config_mtime(self):
+        try:
+            return os.stat(self._config_path).st_mtime
+        except OSError as e:
+            logger.warning(f"Could not read {self._config_path}: {e}")
+            return None
+
+    def _schedule_jobs(self, controllers: list):
+        # Jobs are matched to the previous ones by table, so run history, locks and unchanged schedules survive a reload.
+        now = datetime.now()
+        jobs = {}
+        occurrences = {}
+        for controller in controllers:
+            key = MetricsCollector.table_label(controller)
+            occurrences[key] = occurrences.get(key, 0) + 1
+            if occurrences[key] > 1:
+                key = f"{key}#{occurrences[key]}"
+            if controller.schedule is None:
+                logger.warning(f"{key} has no schedule and is not run by the service.")
+                continue
+            schedule = parse_schedule(controller.schedule)
+            with self._jobs_lock:
+                job = self._jobs.get(key)
+            if job is None:
+                job = ScheduledJob(key, controller, schedule, now)
+            else:
+                job.controller = controller
+                if str(schedule) != str(job.schedule):
+                    job.schedule = schedule
+                    job.next_run_at = schedule.first_run(now)
+            jobs[key] = job
+            logger.info(f"{key} scheduled with {job.schedule}, next run at {job.next_run_at.isoformat(timespec='seconds')}.")
+        with self._jobs_lock:
+            self._jobs = jobs
+
+    def serve_forever(self):
+        self._install_signal_handlers()
+        self._start_http_server()
+        self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="scheduled")
+        logger.info(f"Quality checks service started with {len(self._jobs)} scheduled controllers and {self._max_workers} workers.")
+        next_reload_check = time.time() + self._reload_interval_seconds
+        try:
+            while not self._stop_event.is_set():
+                now = datetime.now()
+                with self._jobs_lock:
+                    due_jobs = [job for job in self._jobs.values() if job.next_run_at <= now]
+                for job in due_jobs:
+                    self._submit(job, now)
+                if time.time() >= next_reload_check:
+                    self._reload_if_changed()
+                    next_reload_check = time.time() + self._reload_interval_seconds
+                self._stop_event.wait(self._tick_seconds)
+        finally:
+            logger.info("Stopping the quality checks service, waiting for running controllers.")
+            self._pool.shutdown(wait=True)
+            if self._http_server is not None:
+                self._http_server.shutdown()
+                self._http_server.server_close()
+            self._executor.close()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _install_signal_handlers(self):
+        try:
+            for signal_number in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signal_number, lambda *_: self.stop())
+        except ValueError:
+            # Signal handlers can only be installed from the main thread.
+            logger.info("Service is not running in the main thread, stop it with stop().")
+
+    def _start_http_server(self):
+        if self._port is None:
+            return
+        self._http_server = ThreadingHTTPServer((self._host, self._port), StatusRequestHandler)
+        self._http_server.daemon_threads = True
+        self._http_server.service = self
+        threading.Thread(target=self._http_server.serve_forever, name="status-http", daemon=True).start()
+        logger.info(f"Status endpoint listening on http://{self._host}:{self._http_server.server_address[1]}.")
+
+    @property
+    def http_port(self):
+        return self._http_server.server_address[1] if self._http_server is not None else None
+
+    def _submit(self, job: ScheduledJob, now: datetime):
+        # The next slot is taken from the due time, not from the tick or the end of the run, so schedules don't
+        # drift; slots missed while the service was busy or paused are skipped instead of run back to back.
+        next_run_at = job.schedule.next_after(job.next_run_at)
+        while next_run_at <= now:
+            next_run_at = job.schedule.next_after(next_run_at)
+        job.next_run_at = next_run_at
+        if not job.lock.acquire(blocking=False):
+            job.skipped_runs += 1
+            logger.warning(f"Skipping a run of {job.key}, the previous run has not finished yet.")
+            return
+        self._pool.submit(self._run_job, job)
+
+    def _run_job(self, job: ScheduledJob):
+        controller = job.controller
+        job.last_started_at = time.time()
+        try:
+            job.last_duration_seconds = self._executor.run_controller(controller)
+            job.last_results = {control["control_name"]: {"result": control["result"], "status": control["status"]} for control in controller.executor_feed}
+            job.last_status = self._run_status(controller)
+            job.last_error = None
+            logger.info(f"Scheduled run of {job.key} finished with {job.last_status} in {job.last_duration_seconds} seconds.")
+        except Exception as e:
+            job.last_status = "ERROR"
+            job.last_error = str(e)
+            logger.error(f"Scheduled run of {job.key} failed: {e}", exc_info=True)
+        finally:
+            job.last_finished_at = time.time()
+            job.runs += 1
+            job.lock.release()
+
+    @staticmethod
+    def _run_status(controller) -> str:
+        statuses = {control["status"] for control in controller.executor_feed}
+        if "Not Run" in statuses:
+            return "ERROR"
+        return "FAILURE" if "FAILURE" in statuses else "SUCCESS"
+
+    def _reload_if_changed(self):
+        config_mtime = self._read_config_mtime()
+        if config_mtime is None or config_mtime == self._config_mtime:
+            return
+        self._config_mtime = config_mtime
+        try:
+            with open(self._config_path, "r") as file:
+                config = yaml.safe_load(file)
+            if self._select_controllers is not None:
+                config["controllers"] = self._select_controllers(config["controllers"])
+            # Schedules are checked before the executor swaps its controllers, so a bad one changes nothing.
+            for controller_config in config["controllers"]:
+                if controller_config.get("schedule") is not None:
+                    parse_schedule(controller_config["schedule"])
+            controllers = self._executor.reload(config)
+            self._schedule_jobs(controllers)
+        except Exception as e:
+            self._last_reload_error = str(e)
+            logger.error(f"Reloading {self._config_path} failed, keeping the previous config: {e}")
+            return
+        self._reloads += 1
+        self._loaded_at = time.time()
+        self._last_reload_error = None
+        logger.info(f"Reloaded {self._config_path}.")
+
+    def health(self) -> dict:
+        with self._jobs_lock:
+            jobs = list(self._jobs.values())
+        return {
+            "status": "ok" if not self._stop_event.is_set() else "stopping",
+            "uptime_seconds": round(time.time() - self._started_at, 1),
+            "config_loaded_at": self._loaded_at,
+            "config_reloads": self._reloads,
+            "last_reload_error": self._last_reload_error,
+            "scheduled_controllers": len(jobs),
+            "running_controllers": sum(1 for job in jobs if job.lock.locked()),
+        }
+
+    def status(self) -> dict:
+        with self._jobs_lock:
+            jobs = list(self._jobs.values())
+        return {"controllers": [job.to_dict() for job in jobs]}
+
+    def prometheus_metrics(self) -> str:
+        return MetricsCollector.to_prometheus(self._executor.build_metrics_report())
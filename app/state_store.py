@@ -0,0 +1,64 @@
+import json
+import time
+import logging
+import sqlite3
+import threading
+
+logger = logging.getLogger("QUALITY_CHEKS")
+
+class StateStore:
+
+    DEFAULT_PATH = "./.quality_state.sqlite"
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self._path = path
+        self._lock = threading.Lock()
+        self._init_schema()
+        logger.info(f"State store initialized at {self._path}.")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._path, timeout=30)
+
+    def _init_schema(self):
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        """
+                        CREATE TABLE IF NOT EXISTS watermarks (
+                            state_key TEXT PRIMARY KEY,
+                            watermark TEXT NOT NULL,
+                            results TEXT NOT NULL,
+                            updated_at REAL NOT NULL
+                        )
+                        """
+                    )
+            finally:
+                conn.close()
+
+    def load(self, state_key: str):
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT watermark, results FROM watermarks WHERE state_key = ?", (state_key,)
+                ).fetchone()
+            finally:
+                conn.close()
+        if row is None:
+            return None
+        return {"watermark": json.loads(row[0]), "results": json.loads(row[1])}
+
+    def save(self, state_key: str, watermark, results: dict):
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO watermarks (state_key, watermark, results, updated_at) VALUES (?, ?, ?, ?)",
+                        (state_key, json.dumps(watermark), json.dumps(results), time.time()),
+                    )
+            finally:
+                conn.close()
+        logger.info(f"Saved watermark {watermark} for {state_key}.")
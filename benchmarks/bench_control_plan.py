@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from controllers.product_controller import ProductController
+from controllers.control_plan import ControlPlan
+
+CATEGORIES = ["Elektronik", "Moda", "Ev & Yaşam", "Spor", "Otomotiv", "Gıda", "Bilinmeyen", "Eğlence", None]
+COLUMN_OPERATIONS = [
+    {"name": "price", "controls": [
+        {"name": "missing_price_count", "responsible_method": "count_null_prices"},
+        {"name": "non_positive_price_count", "responsible_method": "count_invalid_prices"},
+    ]},
+    {"name": "stock", "controls": [
+        {"name": "missing_stock_count", "responsible_method": "count_null_stocks"},
+        {"name": "negative_stock_count", "responsible_method": "count_negative_stocks"},
+        {"name": "overvalued_stock_count", "responsible_method": "count_overvalued_stocks"},
+    ]},
+    {"name": "category", "controls": [
+        {"name": "missing_category_count", "responsible_method": "count_null_categories"},
+        {"name": "uncategorized_category_count", "responsible_method": "count_uncategorized_categories"},
+    ]},
+]
+
+def make_chunk(rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    price = rng.uniform(-50.0, 500.0, rows).round(2)
+    price[rng.random(rows) < 0.05] = np.nan
+    stock = rng.integers(-50, 5000, rows).astype("float64")
+    stock[rng.random(rows) < 0.05] = np.nan
+    category = rng.choice(np.array(CATEGORIES, dtype=object), rows)
+    return pd.DataFrame({"id": np.arange(rows), "price": price, "stock": stock, "category": category})
+
+def make_controller() -> ProductController:
+    return ProductController(
+        db_type="mysql", db_user="", db_password="", db_host="", db_port=0, db_name="",
+        table_name="products", conn_idle_timeout=0, chunk_size=0, datahub_server_url="",
+        datahub_platform_urn="", datahub_entity_urn="", column_operations=COLUMN_OPERATIONS,
+    )
+
+def run_legacy_loop(chunks: list) -> list:
+    controller = make_controller()
+    for chunk in chunks:
+        for control in controller.executor_feed:
+            result, status = getattr(controller, control["method"])(chunk, control["column"])
+            control["result"] += result
+            control["status"] = status
+    return [control["result"] for control in controller.executor_feed]
+
+def run_control_plan(chunks: list) -> list:
+    controller = make_controller()
+    plan = ControlPlan(controller, controller.executor_feed)
+    for chunk in chunks:
+        plan.evaluate(chunk)
+    return [control["result"] for control in controller.executor_feed]
+
+def best_of(func, chunks: list, repeat: int) -> tuple:
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        results = func(chunks)
+        timings.append(time.perf_counter() - start_time)
+    return min(timings), results
+
+def main():
+    parser = argparse.ArgumentParser(description="Legacy per-control loop vs fused ControlPlan.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    chunks = [make_chunk(min(args.chunk_size, args.rows - start), rng) for start in range(0, args.rows, args.chunk_size)]
+
+    legacy_time, legacy_results = best_of(run_legacy_loop, chunks, args.repeat)
+    plan_time, plan_results = best_of(run_control_plan, chunks, args.repeat)
+    if legacy_results != plan_results:
+        raise SystemExit(f"Result mismatch: legacy={legacy_results} plan={plan_results}")
+
+    print(f"rows={args.rows} chunk_size={args.chunk_size} chunks={len(chunks)}")
+    print(f"legacy loop : {legacy_time:.3f}s ({args.rows / legacy_time:,.0f} rows/s)")
+    print(f"control plan: {plan_time:.3f}s ({args.rows / plan_time:,.0f} rows/s)")
+    print(f"speedup     : {legacy_time / plan_time:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import os
+import sys
+import json
+import time
+import copy
+import argparse
+import platform
+import subprocess
+import yaml
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(BENCHMARK_DIR, "..", "app")
+sys.path.insert(0, APP_DIR)
+
+from data_generator import create_sqlite_table
+
+CONFIG_PATH = os.path.join(APP_DIR, "controllers", "config", "config.yaml")
+
+# Every scenario runs the same ProductController over the same controls; only the fetch and execution settings differ.
+# They are pinned here so editing config.yaml does not change what is being measured.
+CONTROLLER_CLASS = "ProductController"
+COLUMN_OPERATIONS = [
+    {"name": "id"},
+    {"name": "name"},
+    {"name": "price", "controls": [
+        {"name": "missing_price_count", "responsible_method": "count_null_prices"},
+        {"name": "non_positive_price_count", "responsible_method": "count_invalid_prices"},
+    ]},
+    {"name": "stock", "controls": [
+        {"name": "missing_stock_count", "responsible_method": "count_null_stocks"},
+        {"name": "negative_stock_count", "responsible_method": "count_negative_stocks"},
+        {"name": "overvalued_stock_count", "responsible_method": "count_overvalued_stocks"},
+    ]},
+    {"name": "category", "controls": [
+        {"name": "missing_category_count", "responsible_method": "count_null_categories"},
+        {"name": "uncategorized_category_count", "responsible_method": "count_uncategorized_categories"},
+    ]},
+]
+
+SCENARIOS = {
+    "pandas": {"execution_mode": "pandas", "fetch_backend": "pandas"},
+    "arrow": {"execution_mode": "pandas", "fetch_backend": "arrow"},
+    "keyset": {"execution_mode": "pandas", "scan_key": "id", "scan_workers": 4},
+    "pushdown": {"execution_mode": "pushdown"},
+}
+
+def build_config(scenario: str, db_type: str, db_name: str, chunk_size: int, mysql: dict) -> dict:
+    with open(CONFIG_PATH, "r") as file:
+        config = yaml.safe_load(file)
+    controller = copy.deepcopy(config["controllers"][0])
+    for key in ("execution_mode", "fetch_backend", "scan_key", "scan_workers", "watermark_column", "profiler"):
+        controller.pop(key, None)
+    controller.update({"class_name": CONTROLLER_CLASS, "column_operations": copy.deepcopy(COLUMN_OPERATIONS)})
+    controller.update(SCENARIOS[scenario])
+    controller.update({"db_type": db_type, "db_name": db_name, "chunk_size": chunk_size, **mysql})
+    return {"controllers": [controller]}
+
+def run_scenario(config: dict) -> dict:
+    # Runs inside its own interpreter, so peak RSS and engine pools are not shared between scenarios.
+    from executor import Executor
+
+    executor = Executor(config)
+    try:
+        start_time = time.perf_counter()
+        executor.execute_controllers()
+        elapsed_seconds = round(time.perf_counter() - start_time, 4)
+        controller = executor._controllers[0]
+        metrics = controller.execution_metrics
+        return {
+            "elapsed_seconds": elapsed_seconds,
+            "rows": metrics.get("rows", 0),
+            "chunks": metrics.get("chunks", 0),
+            "rows_per_second": metrics.get("rows_per_second", 0.0),
+            "fetch_seconds": metrics.get("fetch_seconds", 0.0),
+            "mean_chunk_latency_seconds": round(metrics["fetch_seconds"] / metrics["chunks"], 6) if metrics.get("chunks") else None,
+            "pushdown_seconds": metrics.get("pushdown_seconds"),
+            "control_cpu_seconds": round(sum(metrics.get("control_cpu_seconds", {}).values()), 6),
+            "peak_rss_bytes": metrics.get("peak_rss_bytes"),
+            "peak_rss_delta_bytes": metrics.get("peak_rss_delta_bytes"),
+            "results": {control["control_name"]: control["result"] for control in controller.executor_feed},
+        }
+    finally:
+        executor.close()
+
+def run_in_subprocess(config: dict) -> dict:
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run-config", json.dumps(config)],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "scenario failed")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARK_DIR, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+def compare(results: list, baseline_path: str, tolerance: float) -> list:
+    with open(baseline_path, "r") as file:
+        baseline = {(entry["rows_total"], entry["scenario"]): entry for entry in json.load(file)["results"]}
+    regressions = []
+    for entry in results:
+        previous = baseline.get((entry["rows_total"], entry["scenario"]))
+        if previous is None or not previous.get("elapsed_seconds"):
+            continue
+        ratio = entry["elapsed_seconds"] / previous["elapsed_seconds"]
+        if ratio > 1 + tolerance:
+            regressions.append(f"{entry['scenario']} at {entry['rows_total']} rows: {previous['elapsed_seconds']}s -> {entry['elapsed_seconds']}s ({ratio:.2f}x)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Executor end to end over generated products tables.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000], help="Table sizes, e.g. 1000000 10000000 100000000.")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--chunk-size", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--target", choices=["sqlite", "mysql"], default="sqlite")
+    parser.add_argument("--data-dir", default=os.path.join(BENCHMARK_DIR, "data"))
+    parser.add_argument("--mysql-host", default="localhost")
+    parser.add_argument("--mysql-port", type=int, default=3377)
+    parser.add_argument("--mysql-user", default="root")
+    parser.add_argument("--mysql-password", default="root")
+    parser.add_argument("--mysql-db", default="inventory")
+    parser.add_argument("--output", default=os.path.join(BENCHMARK_DIR, "results", "bench_executor.json"))
+    parser.add_argument("--baseline", help="Previous results file; exits non-zero when a scenario got slower than --tolerance.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--run-config", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_config:
+        print(json.dumps(run_scenario(json.loads(args.run_config))))
+        return
+
+    mysql = {}
+    if args.target == "mysql":
+        from data_generator import create_mysql_table
+
+        mysql = {"db_host": args.mysql_host, "db_port": args.mysql_port, "db_user": args.mysql_user, "db_password": args.mysql_password}
+
+    results = []
+    for row_count in args.rows:
+        if args.target == "mysql":
+            db_name = args.mysql_db
+            create_mysql_table(
+                f"mysql+mysqlconnector://{args.mysql_user}:{args.mysql_password}@{args.mysql_host}:{args.mysql_port}/{args.mysql_db}", row_count
+            )
+        else:
+            os.makedirs(args.data_dir, exist_ok=True)
+            db_name = os.path.join(args.data_dir, f"products_{row_count}.sqlite")
+            create_sqlite_table(db_name, row_count, reuse=True)
+
+        reference = None
+        for scenario in args.scenarios:
+            config = build_config(scenario, args.target, db_name, args.chunk_size, mysql)
+            runs = []
+            for _ in range(args.repeat):
+                try:
+                    runs.append(run_in_subprocess(config))
+                except RuntimeError as e:
+                    print(f"{scenario:<9} rows={row_count:<11} failed: {e}")
+                    break
+            if not runs:
+                continue
+            best = min(runs, key=lambda run: run["elapsed_seconds"])
+            if reference is None:
+                reference = best["results"]
+            elif best["results"] != reference:
+                raise SystemExit(f"{scenario} results differ from {args.scenarios[0]}: {best['results']} != {reference}")
+            entry = {"rows_total": row_count, "scenario": scenario, **{key: value for key, value in best.items() if key != "results"}}
+            results.append(entry)
+            print(
+                f"{scenario:<9} rows={row_count:<11} elapsed={entry['elapsed_seconds']:>8.2f}s "
+                f"throughput={row_count / entry['elapsed_seconds'] if entry['elapsed_seconds'] else 0:>12,.0f} rows/s "
+                f"peak_rss={(entry['peak_rss_bytes'] or 0) / 1024 / 1024:>8.1f} MiB"
+            )
+
+    report = {
+        "generated_at": time.time(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "target": args.target,
+        "chunk_size": args.chunk_size,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from database import Database
+from data_generator import create_sqlite_table
+
+COLUMNS = ["price", "stock", "category"]
+
+def make_database(path: str) -> Database:
+    return Database(db_type="sqlite", db_user=None, db_password=None, db_host=None, db_port=None, db_name=path, conn_idle_timeout=None)
+
+def run_pandas(db: Database, chunk_size: int) -> int:
+    conn = db.open_connection()
+    try:
+        dtypes = {column: dtype for column, dtype in db.get_column_dtypes("products").items() if column in COLUMNS}
+        return sum(len(chunk) for chunk in db.fetch_table_in_chunks(conn, chunk_size, "products", columns=COLUMNS, dtypes=dtypes))
+    finally:
+        db.close_connection(conn)
+
+def run_arrow(db: Database, chunk_size: int) -> int:
+    return sum(len(chunk) for chunk in db.fetch_arrow_chunks(chunk_size, "products", columns=COLUMNS))
+
+def best_of(func, db: Database, chunk_size: int, repeat: int) -> tuple:
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        rows = func(db, chunk_size)
+        timings.append(time.perf_counter() - start_time)
+    return min(timings), rows
+
+def main():
+    parser = argparse.ArgumentParser(description="pd.read_sql fetch path vs Arrow fetch path.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--sqlite-path", default="./benchmarks/data/products.sqlite")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.sqlite_path)), exist_ok=True)
+    create_sqlite_table(args.sqlite_path, args.rows)
+    db = make_database(args.sqlite_path)
+    if not db.arrow_available():
+        raise SystemExit("pyarrow and connectorx are required for the Arrow fetch path.")
+
+    pandas_time, pandas_rows = best_of(run_pandas, db, args.chunk_size, args.repeat)
+    arrow_time, arrow_rows = best_of(run_arrow, db, args.chunk_size, args.repeat)
+    if pandas_rows != arrow_rows:
+        raise SystemExit(f"Row count mismatch: pandas={pandas_rows} arrow={arrow_rows}")
+
+    print(f"rows={args.rows} chunk_size={args.chunk_size}")
+    print(f"pd.read_sql: {pandas_time:.3f}s ({pandas_rows / pandas_time:,.0f} rows/s)")
+    print(f"arrow      : {arrow_time:.3f}s ({arrow_rows / arrow_time:,.0f} rows/s)")
+    print(f"speedup    : {pandas_time / arrow_time:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+import argparse
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from publisher import AssertionPublisher
+from datahub_stub import start_stub
+
+def make_controllers(server_url: str, table_count: int, controls_per_table: int) -> list:
+    return [
+        SimpleNamespace(
+            table_name=f"table_{table}",
+            datahub_server_url=server_url,
+            datahub_platform_urn="urn:li:dataPlatform:mysql",
+            datahub_entity_urn=f"urn:li:dataset:(urn:li:dataPlatform:mysql,inventory.table_{table},PROD)",
+            executor_feed=[
+                {"column": "value", "control_name": f"control_{control}", "result": control % 2, "status": "SUCCESS" if control % 2 == 0 else "FAILURE"}
+                for control in range(controls_per_table)
+            ],
+        )
+        for table in range(table_count)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish assertions to a local DataHub GMS stub.")
+    parser.add_argument("--tables", type=int, default=50)
+    parser.add_argument("--controls", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--visibility-delay", type=float, default=0.5)
+    args = parser.parse_args()
+
+    server, state = start_stub(latency_seconds=args.latency, failure_rate=args.failure_rate, visibility_delay_seconds=args.visibility_delay)
+    server_url = f"http://127.0.0.1:{server.server_address[1]}"
+    controllers = make_controllers(server_url, args.tables, args.controls)
+    publisher = AssertionPublisher(max_workers=args.workers, backoff_seconds=0.05)
+    try:
+        start_time = time.perf_counter()
+        urns = publisher.upsert_assertions(controllers)
+        readable = publisher.wait_until_readable(controllers, urns)
+        reported = publisher.report_assertion_results(controllers)
+        elapsed = time.perf_counter() - start_time
+    finally:
+        publisher.close()
+        server.shutdown()
+
+    total = args.tables * args.controls
+    print(f"controls={total} workers={args.workers} latency={args.latency}s failure_rate={args.failure_rate}")
+    print(f"upserted={len(urns)} readable={readable} reported={len(reported)} stub_requests={state.request_count}")
+    print(f"elapsed={elapsed:.2f}s ({total / elapsed:,.0f} controls/s)")
+    if len(urns) != total or len(reported) != total or len(state.results) != total:
+        raise SystemExit("Not every assertion was published.")
+
+if __name__ == "__main__":
+    main()
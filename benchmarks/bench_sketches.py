@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from controllers.sketches import create_sketch
+
+def make_chunks(rows: int, chunk_size: int, rng: np.random.Generator) -> list:
+    # A float column whose values repeat across chunks. Every other chunk only holds whole numbers,
+    # so a value like 7.0 shows up both next to fractions and without them.
+    chunks = []
+    for index, start in enumerate(range(0, rows, chunk_size)):
+        size = min(chunk_size, rows - start)
+        values = rng.integers(0, rows // 4, size).astype("float64")
+        if index % 2:
+            fractional = rng.random(size) < 0.1
+            values[fractional] += 0.5
+        values[rng.random(size) < 0.02] = np.nan
+        chunks.append(pd.Series(values, name="price"))
+    return chunks
+
+def run_sketch(kind: str, options: dict, chunks: list) -> tuple:
+    sketch = create_sketch(kind, options)
+    start_time = time.perf_counter()
+    try:
+        result = sum(sketch.update(chunk) for chunk in chunks)
+        count, details, status = sketch.finish()
+    finally:
+        sketch.close()
+    return time.perf_counter() - start_time, result + count, details
+
+def check_split_value():
+    # The same value must hash alike in every chunk, whatever else the chunk holds.
+    _, duplicates, _ = run_sketch("duplicate", {}, [pd.Series([1.0, 2.0]), pd.Series([1.0, 2.5])])
+    if duplicates != 1:
+        raise SystemExit(f"unique: 1.0 split across chunks gave {duplicates} duplicates instead of 1")
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput and accuracy of the unique, distinct_count and heavy_hitters sketches.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=20_000)
+    parser.add_argument("--memory-limit", type=int, default=5_000_000, help="Set below the distinct count to measure spilling.")
+    args = parser.parse_args()
+
+    check_split_value()
+    chunks = make_chunks(args.rows, args.chunk_size, np.random.default_rng(42))
+    values = pd.concat(chunks, ignore_index=True).dropna()
+    exact_duplicates = len(values) - values.nunique()
+    exact_distinct = values.nunique()
+
+    elapsed, duplicates, _ = run_sketch("duplicate", {"memory_limit": args.memory_limit}, chunks)
+    print(f"unique         : {elapsed:.3f}s ({args.rows / elapsed:,.0f} rows/s) duplicates={duplicates} exact={exact_duplicates}")
+    if duplicates != exact_duplicates:
+        raise SystemExit(f"unique counted {duplicates} duplicates, expected {exact_duplicates}")
+
+    elapsed, distinct, _ = run_sketch("distinct", {"precision": 14}, chunks)
+    error = abs(distinct - exact_distinct) / exact_distinct
+    print(f"distinct_count : {elapsed:.3f}s ({args.rows / elapsed:,.0f} rows/s) estimate={distinct} exact={exact_distinct} error={error:.2%}")
+    # Four standard errors of a precision 14 HyperLogLog.
+    if error > 0.033:
+        raise SystemExit(f"distinct_count estimate {distinct} is {error:.2%} off {exact_distinct}")
+
+    elapsed, _, details = run_sketch("heavy_hitters", {"max_share": 0.01, "top_k": 10}, chunks)
+    print(f"heavy_hitters  : {elapsed:.3f}s ({args.rows / elapsed:,.0f} rows/s) {details.get('top_values', '')[:80]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import subprocess
+import statistics
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+APP_DIR = os.path.join(ROOT, "app")
+
+# Modules that must stay out of planning; each one costs from a tenth to half a second to import.
+HEAVY_MODULES = ("pandas", "numpy", "sqlalchemy", "pyarrow", "datahub", "duckdb", "psycopg2", "pymysql")
+
+IMPORT_TIME_PATTERN = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def time_dry_run(config_path: str) -> float:
+    start_time = time.perf_counter()
+    subprocess.run(
+        [sys.executable, os.path.join(APP_DIR, "app.py"), "--config", config_path, "--dry-run"],
+        cwd=ROOT, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start_time
+
+def loaded_modules(config_path: str) -> list:
+    # Plans the run in a fresh interpreter and lists the heavy modules that got imported along the way.
+    script = (
+        "import sys, json, logging; logging.disable(logging.CRITICAL); "
+        f"sys.path.insert(0, {APP_DIR!r}); sys.argv = ['app.py']; "
+        "from app import App; "
+        f"App({config_path!r}).plan(); "
+        "print(json.dumps(sorted({name.split('.')[0] for name in sys.modules})))"
+    )
+    output = subprocess.run([sys.executable, "-c", script], cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    return [name for name in json.loads(output) if name in HEAVY_MODULES]
+
+def slowest_imports(limit: int) -> list:
+    # Modules imported directly by app.py, by cumulative import time (python -X importtime).
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {APP_DIR!r}); import app"],
+        cwd=ROOT, check=True, capture_output=True, text=True,
+    ).stderr
+    imports = []
+    for line in stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match and len(match.group(3)) == 3:
+            imports.append((match.group(4), int(match.group(2)) / 1e6))
+    return sorted(imports, key=lambda item: item[1], reverse=True)[:limit]
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how long the CLI takes to start and plan a run, and fail when it regresses.")
+    parser.add_argument("--config", default=os.path.join(APP_DIR, "controllers", "config", "config.yaml"))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=1.0, help="Fail when the median --dry-run takes longer than this.")
+    args = parser.parse_args()
+
+    timings = [time_dry_run(args.config) for _ in range(args.repeat)]
+    median = statistics.median(timings)
+    heavy_modules = loaded_modules(args.config)
+    print(f"dry_run median={median:.3f}s min={min(timings):.3f}s max={max(timings):.3f}s runs={args.repeat}")
+    for name, seconds in slowest_imports(8):
+        print(f"  import {name}: {seconds:.3f}s")
+    print(f"heavy modules loaded while planning: {', '.join(heavy_modules) or 'none'}")
+
+    failures = []
+    if median > args.max_seconds:
+        failures.append(f"median --dry-run time {median:.3f}s is over {args.max_seconds}s")
+    if heavy_modules:
+        failures.append(f"planning imported {', '.join(heavy_modules)}")
+    if failures:
+        raise SystemExit("Startup regression: " + "; ".join(failures) + ".")
+
+if __name__ == "__main__":
+    main()
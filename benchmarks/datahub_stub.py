@@ -0,0 +1,111 @@
+import json
+import time
+import random
+import argparse
+import threading
+from urllib.parse import unquote, urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class DataHubStubState:
+    # Minimal stand-in for the DataHub GMS endpoints used by AssertionHandler.
+
+    def __init__(self, latency_seconds: float = 0.0, failure_rate: float = 0.0, visibility_delay_seconds: float = 0.0, seed: int = 42):
+        self.latency_seconds = latency_seconds
+        self.failure_rate = failure_rate
+        self.visibility_delay_seconds = visibility_delay_seconds
+        self.assertions = {}
+        self.results = []
+        self.request_count = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            self.request_count += 1
+            return self._random.random() < self.failure_rate
+
+def make_handler(state: DataHubStubState):
+
+    class DataHubStubHandler(BaseHTTPRequestHandler):
+
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, body: dict):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            time.sleep(state.latency_seconds)
+            path = urlparse(self.path).path
+            if path == "/config":
+                self._send_json(200, {"noCode": "true", "versions": {"acryldata/datahub": {"version": "v0.15.0"}}})
+            elif path.startswith("/aspects/"):
+                urn = unquote(path[len("/aspects/"):])
+                with state._lock:
+                    created_at = state.assertions.get(urn)
+                if created_at is None or time.time() - created_at < state.visibility_delay_seconds:
+                    self._send_json(404, {})
+                else:
+                    self._send_json(200, {"aspect": {"com.linkedin.metadata.key.AssertionKey": {"assertionId": urn.rsplit(":", 1)[-1]}}})
+            else:
+                self._send_json(404, {})
+
+        def do_POST(self):
+            time.sleep(state.latency_seconds)
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if urlparse(self.path).path != "/api/graphql":
+                self._send_json(404, {})
+                return
+            if state.should_fail():
+                self._send_json(503, {"message": "stub failure"})
+                return
+            query = body.get("query", "")
+            variables = body.get("variables", {})
+            if "upsertCustomAssertion" in query:
+                with state._lock:
+                    state.assertions.setdefault(variables["assertionUrn"], time.time())
+                self._send_json(200, {"data": {"upsertCustomAssertion": {"urn": variables["assertionUrn"]}}})
+            elif "reportAssertionResult" in query:
+                with state._lock:
+                    state.results.append(variables)
+                self._send_json(200, {"data": {"reportAssertionResult": True}})
+            else:
+                self._send_json(200, {"errors": [{"message": "unsupported query"}]})
+
+    return DataHubStubHandler
+
+class DataHubStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+def start_stub(port: int = 0, **state_options) -> tuple:
+    state = DataHubStubState(**state_options)
+    server = DataHubStubServer(("127.0.0.1", port), make_handler(state))
+    thread = threading.Thread(target=server.serve_forever, name="datahub-stub", daemon=True)
+    thread.start()
+    return server, state
+
+def main():
+    parser = argparse.ArgumentParser(description="Local DataHub GMS stub.")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--visibility-delay", type=float, default=0.0)
+    args = parser.parse_args()
+    server, _ = start_stub(args.port, latency_seconds=args.latency, failure_rate=args.failure_rate, visibility_delay_seconds=args.visibility_delay)
+    print(f"DataHub stub listening on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()